@@ -8,6 +8,9 @@ bl_info = {
     "category": "Development",
 }
 
+import time
+_IMPORT_START = time.perf_counter() # Addon load cost is reported in the panel
+
 import bpy
 import http.server
 import socketserver
@@ -18,39 +21,137 @@ import io
 import os
 import queue
 import traceback
-import time
-import tempfile
-import base64
 import secrets
+import collections
+import shutil
+import hashlib
+import importlib
+import bisect
 import urllib.parse
+import fnmatch
+import signal
 
 # ==============================================================================
 # CONSTANTS & CONFIG
 # ==============================================================================
-PORT = 8081
+PORT = 8081 # Port actually bound; picked from the configured range at start
+DEFAULT_PORT_RANGE = (8081, 8099)
+PORT_RANGE_ENV = "GEMINI_BRIDGE_PORTS" # e.g. "9000-9100", or "0" for any free port
+INSTANCES_DIR_NAME = "instances" # One discovery record per live bridge
 SERVER_TOKEN = secrets.token_urlsafe(32)
 
 # PRODUCTION STORAGE:
 # We use Blender's 'presets' folder in USER resources. 
 # This persists across Blender updates/restarts and avoids permission issues.
-DATA_DIR = os.path.join(bpy.utils.user_resource('SCRIPTS', path="presets"), "gemini_assistant_data")
-
-if not os.path.exists(DATA_DIR):
-    try:
-        os.makedirs(DATA_DIR, exist_ok=True)
-    except Exception as e:
-        print(f"[Gemini] Error creating data directory: {e}")
-
-HISTORY_FILE = os.path.join(DATA_DIR, "gemini_history.json")
-MEMORY_FILE = os.path.join(DATA_DIR, "gemini_memory.txt")
-TOOLS_FILE = os.path.join(DATA_DIR, "gemini_tools.json")
-
-print(f"[Gemini] Bridge Loaded. Data Persistence: {DATA_DIR}")
+# Resolved on first use (see get_data_dir) so importing the addon stays cheap.
+HISTORY_FILE_NAME = "gemini_history.json"
+MEMORY_FILE_NAME = "gemini_memory.txt"
+TOOLS_FILE_NAME = "gemini_tools.json"
+OUTPUT_DIR_NAME = "output" # Spill files for full script output
+
+# When the HTTP server starts; overridable in the addon preferences.
+DEFAULT_START_MODE = 'DEFERRED'
+DEFERRED_START_DELAY = 1.0 # Seconds after startup for the DEFERRED mode
+
+# Background (`blender -b`) mode, see run_background.
+BACKGROUND_POLL_INTERVAL = 1.0 # Seconds between housekeeping passes when idle
+READY_PREFIX = "[Gemini] Ready:" # Followed by a JSON record with port, token and pid
+
+CODE_CACHE_SIZE = 128 # Compiled tool scripts kept in memory
+
+# Viewport redraws requested by scripts are coalesced (see RedrawScheduler).
+DEFAULT_REDRAW_INTERVAL = 0.0 # Minimum seconds between redraws; 0 = at most once per queue tick
+
+# Modules imported once at server start and injected into every script's globals.
+DEFAULT_PRELOAD_MODULES = "math, random, bmesh, mathutils, numpy"
+SESSION_IDLE_TIMEOUT = 30 * 60 # Seconds before an unused session is evicted
+MAX_SESSIONS = 32
+
+# Script output capture. Beyond HEAD + TAIL characters the middle of a stream
+# is dropped and replaced with a truncation marker.
+OUTPUT_HEAD_CHARS = 32 * 1024
+OUTPUT_TAIL_CHARS = 32 * 1024
+MAX_TRACKED_EXECUTIONS = 32 # Async/spilled executions kept for polling
+STREAM_POLL_INTERVAL = 0.1
+
+# Execution budgets. Off by default; requests opt in with `timeout`/`max_lines`.
+QUEUE_WAIT_GRACE = 5 # Extra seconds the HTTP thread waits beyond a script's timeout
+BUDGET_REFIRE_INTERVAL = 0.05 # Seconds between repeated ScriptTimeouts if a script catches one
+PROFILE_TOP_N = 20 # Default number of functions/allocation sites in profile reports
+
+# Bulk object writes (POST /objects/set).
+BULK_PROPERTIES = {"location": 3, "rotation_euler": 3, "scale": 3, "hide_viewport": 1, "hide_render": 1}
+BULK_ERROR_SAMPLES = 5 # Object names listed per distinct error message
+
+# Scene checkpoints (POST /checkpoint, /restore): .blend copies kept as an LRU.
+CHECKPOINTS_DIR_NAME = "checkpoints"
+CHECKPOINT_TIMEOUT = 300 # Seconds an HTTP thread waits for a save or restore
+DEFAULT_CHECKPOINT_BUDGET_MB = 2048 # Disk budget; overridable in the addon preferences
+MAX_CHECKPOINTS = 20
+
+# Prompt context (GET/POST /context).
+CONTEXT_SECTIONS = ("active_object", "graph", "changes", "memory") # Priority order
+# First-pass share of the budget per section; what is left goes to cut sections in priority order.
+CONTEXT_SHARES = {"active_object": 1.0, "graph": 0.6, "changes": 0.15, "memory": 0.25}
+CONTEXT_DEFAULT_TOKENS = 2000
+CHARS_PER_TOKEN = 4 # Rough estimate used for token budgets
+SCENE_CHANGE_HISTORY = 200 # Depsgraph updates remembered for the "changes" section
+
+# Prometheus metrics exposed on /metrics.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+# Routes reported under their own endpoint label; any other path is "other".
+ENDPOINT_LABELS = frozenset((
+    "/", "/instances", "/metrics", "/history", "/inspect", "/screenshot", "/tools", "/tools/run",
+    "/execute", "/execute/batch", "/execute/output", "/context", "/memory", "/sessions",
+    "/sessions/reset", "/graph/apply", "/objects/set", "/checkpoint", "/checkpoints", "/restore",
+))
+METHOD_LABELS = frozenset(("GET", "POST", "PUT", "DELETE"))
+
+STARTUP_TIMINGS = {} # Milliseconds spent in import / register() / start_server()
 
 # ==============================================================================
 # UTILITIES
 # ==============================================================================
 
+_DATA_DIR = None
+
+
+def get_data_dir():
+    """Resolves (and creates) the persistent data folder on first use."""
+    global _DATA_DIR
+    if _DATA_DIR is None:
+        _DATA_DIR = os.path.join(bpy.utils.user_resource('SCRIPTS', path="presets"), "gemini_assistant_data")
+        if not os.path.exists(_DATA_DIR):
+            try:
+                os.makedirs(_DATA_DIR, exist_ok=True)
+            except Exception as e:
+                print(f"[Gemini] Error creating data directory: {e}")
+        print(f"[Gemini] Data Persistence: {_DATA_DIR}")
+    return _DATA_DIR
+
+
+def data_path(name):
+    return os.path.join(get_data_dir(), name)
+
+
+_LAZY_PATHS = {
+    "HISTORY_FILE": HISTORY_FILE_NAME,
+    "MEMORY_FILE": MEMORY_FILE_NAME,
+    "TOOLS_FILE": TOOLS_FILE_NAME,
+    "OUTPUT_DIR": OUTPUT_DIR_NAME,
+}
+
+
+def __getattr__(name):
+    # Keeps gemini_bridge.DATA_DIR / HISTORY_FILE / ... working for external scripts.
+    if name == "DATA_DIR":
+        return get_data_dir()
+    if name in _LAZY_PATHS:
+        return data_path(_LAZY_PATHS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class BlenderJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder for Blender types."""
     def default(self, obj):
@@ -67,6 +168,42 @@ class BlenderJSONEncoder(json.JSONEncoder):
             pass # Fallback to string representation
         return str(obj)
 
+class CodeCache:
+    """LRU of compiled code objects keyed by a hash of their source."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    @staticmethod
+    def key(source):
+        import hashlib
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def compile(self, source, filename="<gemini>"):
+        """Returns the code object for source. Raises SyntaxError if invalid."""
+        key = self.key(source)
+        with self._lock:
+            code = self._entries.get(key)
+            if code is not None:
+                self._entries.move_to_end(key)
+                return code
+        code = compile(source, filename, 'exec')
+        with self._lock:
+            self._entries[key] = code
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return code
+
+
+CODE_CACHE = CodeCache(CODE_CACHE_SIZE)
+
+
+def format_syntax_error(e):
+    return f"SyntaxError: {e.msg} (line {e.lineno})"
+
+
 class GraphSerializer:
     """Handles serialization of Geometry Nodes trees."""
     
@@ -145,6 +282,983 @@ class GraphSerializer:
             "links": links_data
         }
 
+
+class GraphReconciler:
+    """Applies a target graph (GraphSerializer schema) to a live node tree.
+
+    Nodes are matched by name. Only the differences are applied: missing
+    nodes are created, nodes whose type changed are recreated, label,
+    location, width, mute, extra `properties` and unlinked input defaults
+    are set where they differ, and links are added or removed to match.
+    Location and width are compared at the serializer's precision, and input
+    values it could only emit as str() are skipped, so re-applying an
+    inspect_graph result is a no-op.
+    """
+
+    NODE_PROPS = ("label", "mute")
+
+    @staticmethod
+    def _normalize(value):
+        if value is None or isinstance(value, (bool, int, str)):
+            return value
+        if isinstance(value, float):
+            return round(value, 5)
+        try:
+            return [GraphReconciler._normalize(v) for v in value]
+        except TypeError:
+            return str(value)
+
+    @staticmethod
+    def _link_key(link):
+        if isinstance(link, dict):
+            return (link.get("from_node"), link.get("from_socket"), link.get("to_node"), link.get("to_socket"))
+        return (link.from_node.name, link.from_socket.identifier, link.to_node.name, link.to_socket.identifier)
+
+    @staticmethod
+    def _socket(sockets, identifier):
+        for sock in sockets:
+            if sock.identifier == identifier:
+                return sock
+        # Hand-written graphs may use the display name instead.
+        for sock in sockets:
+            if sock.name == identifier:
+                return sock
+        return None
+
+    @staticmethod
+    def _node_changes(node, target):
+        """Yields (kind, key, old, new) for properties of node that differ from target."""
+        for prop in GraphReconciler.NODE_PROPS:
+            if prop in target:
+                old = GraphReconciler._normalize(getattr(node, prop, None))
+                if old != GraphReconciler._normalize(target[prop]):
+                    yield ("property", prop, old, target[prop])
+        if target.get("location") is not None:
+            old = [round(v, 1) for v in node.location]
+            new = [round(float(v), 1) for v in target["location"]]
+            if old != new:
+                yield ("property", "location", old, new)
+        if target.get("width") is not None:
+            old, new = round(node.width, 1), round(float(target["width"]), 1)
+            if old != new:
+                yield ("property", "width", old, new)
+        for prop, value in (target.get("properties") or {}).items():
+            old = GraphReconciler._normalize(getattr(node, prop, None))
+            if old != GraphReconciler._normalize(value):
+                yield ("property", prop, old, value)
+        for identifier, sock_data in (target.get("inputs") or {}).items():
+            value = sock_data.get("value") if isinstance(sock_data, dict) else sock_data
+            if value is None:
+                continue
+            sock = GraphReconciler._socket(node.inputs, identifier)
+            if sock is None or not hasattr(sock, "default_value"):
+                continue
+            if isinstance(value, str) and not isinstance(sock.default_value, str):
+                continue # GraphSerializer's str() fallback (colors, ID pointers); not settable as-is
+            old = GraphReconciler._normalize(sock.default_value)
+            if old != GraphReconciler._normalize(value):
+                yield ("input", identifier, old, value)
+
+    @staticmethod
+    def plan(node_tree, target, remove_missing=True):
+        """Computes the changeset for turning node_tree into target, without touching it."""
+        live = {node.name: node for node in node_tree.nodes}
+        wanted = {}
+        for node_data in target.get("nodes") or []:
+            if node_data.get("name"):
+                wanted[node_data["name"]] = node_data
+
+        plan = {"add": [], "replace": [], "remove": [], "update": [], "link_add": [], "link_remove": [], "errors": []}
+        for name, node_data in wanted.items():
+            node = live.get(name)
+            if node is None:
+                plan["add"].append(name)
+            elif node_data.get("type") and node.bl_idname != node_data["type"]:
+                plan["replace"].append(name)
+            else:
+                for kind, key, old, new in GraphReconciler._node_changes(node, node_data):
+                    plan["update"].append({"node": name, kind: key, "from": old, "to": new})
+        if remove_missing:
+            plan["remove"] = [name for name in live if name not in wanted]
+
+        removed, replaced = set(plan["remove"]), set(plan["replace"])
+        live_links = set()
+        dropped = [] # Links of replaced nodes: recreating the node loses them
+        for link in node_tree.links:
+            try:
+                key = GraphReconciler._link_key(link)
+            except Exception:
+                continue
+            if key[0] in removed or key[2] in removed:
+                continue # Disappear with their node
+            if key[0] in replaced or key[2] in replaced:
+                dropped.append(key)
+            else:
+                live_links.add(key)
+        target_links = [GraphReconciler._link_key(l) for l in target.get("links") or []]
+        target_set = set(target_links)
+        # Even a partial update reports these; the target's own links are added back below.
+        plan["link_remove"].extend(key for key in dropped if key not in target_set)
+        for key in live_links - target_set:
+            # A partial target only owns links between the nodes it names.
+            if remove_missing or (key[0] in wanted and key[2] in wanted):
+                plan["link_remove"].append(key)
+        kept = set(wanted) if remove_missing else set(wanted) | set(live)
+        for key in dict.fromkeys(target_links):
+            if key[0] not in kept or key[2] not in kept:
+                plan["errors"].append(f"link {key[0]}.{key[1]} -> {key[2]}.{key[3]}: unknown node")
+            elif key not in live_links:
+                plan["link_add"].append(key)
+        return plan
+
+    @staticmethod
+    def apply(node_tree, target, remove_missing=True, dry_run=False):
+        """Reconciles node_tree with target in one pass; returns the changeset."""
+        start = time.perf_counter()
+        plan = GraphReconciler.plan(node_tree, target, remove_missing)
+        wanted = {n["name"]: n for n in target.get("nodes") or [] if n.get("name")}
+        errors = plan["errors"]
+
+        if not dry_run:
+            nodes = node_tree.nodes
+            for name in plan["remove"] + plan["replace"]:
+                try:
+                    nodes.remove(nodes[name])
+                except Exception as e:
+                    errors.append(f"remove {name}: {e}")
+            for name in plan["replace"] + plan["add"]:
+                node_data = wanted[name]
+                try:
+                    node = nodes.new(node_data.get("type"))
+                    node.name = name
+                except Exception as e:
+                    errors.append(f"add {name} ({node_data.get('type')}): {e}")
+                    continue
+                # A fresh node starts from defaults, so everything in the target is a change.
+                for kind, key, old, new in GraphReconciler._node_changes(node, node_data):
+                    GraphReconciler._set(node, kind, key, new, errors)
+            by_name = {node.name: node for node in nodes}
+            for change in plan["update"]:
+                kind = "input" if "input" in change else "property"
+                GraphReconciler._set(by_name[change["node"]], kind, change[kind], change["to"], errors)
+
+            links = node_tree.links
+            if plan["link_remove"]:
+                doomed = set(plan["link_remove"])
+                for link in list(links):
+                    try:
+                        if GraphReconciler._link_key(link) in doomed:
+                            links.remove(link)
+                    except Exception as e:
+                        errors.append(f"unlink: {e}")
+            for key in plan["link_add"]:
+                from_node, from_socket, to_node, to_socket = key
+                try:
+                    src = GraphReconciler._socket(by_name[from_node].outputs, from_socket)
+                    dst = GraphReconciler._socket(by_name[to_node].inputs, to_socket)
+                    if src is None or dst is None:
+                        raise KeyError("socket not found")
+                    links.new(src, dst)
+                except Exception as e:
+                    errors.append(f"link {from_node}.{from_socket} -> {to_node}.{to_socket}: {e}")
+
+        as_link = lambda key: dict(zip(("from_node", "from_socket", "to_node", "to_socket"), key))
+        changeset = {
+            "tree": node_tree.name,
+            "dry_run": bool(dry_run),
+            "added_nodes": [{"name": n, "type": wanted[n].get("type")} for n in plan["add"]],
+            "replaced_nodes": [{"name": n, "type": wanted[n].get("type")} for n in plan["replace"]],
+            "removed_nodes": plan["remove"],
+            "updated": plan["update"],
+            "added_links": [as_link(k) for k in plan["link_add"]],
+            "removed_links": [as_link(k) for k in plan["link_remove"]],
+            "errors": errors,
+        }
+        changeset["changes"] = sum(len(changeset[k]) for k in (
+            "added_nodes", "replaced_nodes", "removed_nodes", "updated", "added_links", "removed_links"))
+        changeset["elapsed"] = round(time.perf_counter() - start, 4)
+        return changeset
+
+    @staticmethod
+    def _set(node, kind, key, value, errors):
+        try:
+            if kind == "input":
+                GraphReconciler._socket(node.inputs, key).default_value = value
+            else:
+                setattr(node, key, value)
+        except Exception as e:
+            errors.append(f"set {node.name}.{key}: {e}")
+
+# ==============================================================================
+# SCRIPT OUTPUT
+# ==============================================================================
+
+class BoundedOutput(io.TextIOBase):
+    """Thread-safe text sink that keeps the first and last N characters.
+
+    Offsets count every character ever written, so a reader on another thread
+    can poll with read_from(offset) while the script is still running. With a
+    spill_path, the complete output is also written to that file.
+    """
+
+    def __init__(self, head_limit=OUTPUT_HEAD_CHARS, tail_limit=OUTPUT_TAIL_CHARS, spill_path=None):
+        self.head_limit = head_limit
+        self.tail_limit = tail_limit
+        self.spill_path = spill_path
+        self._lock = threading.Lock()
+        self._head = []
+        self._head_len = 0
+        self._tail = collections.deque()
+        self._tail_len = 0
+        self.total = 0
+        self._spill = None
+        if spill_path:
+            try:
+                self._spill = open(spill_path, 'w', encoding='utf-8')
+            except Exception as e:
+                print(f"[Gemini] Could not open spill file {spill_path}: {e}")
+                self.spill_path = None
+
+    def writable(self):
+        return True
+
+    def write(self, s):
+        if not isinstance(s, str):
+            s = str(s)
+        n = len(s)
+        with self._lock:
+            self.total += n
+            rest = s
+            room = self.head_limit - self._head_len
+            if room > 0:
+                self._head.append(rest[:room])
+                self._head_len += min(room, n)
+                rest = rest[room:]
+            if rest:
+                self._tail.append(rest)
+                self._tail_len += len(rest)
+                while self._tail_len > self.tail_limit:
+                    excess = self._tail_len - self.tail_limit
+                    first = self._tail[0]
+                    if len(first) <= excess:
+                        self._tail.popleft()
+                        self._tail_len -= len(first)
+                    else:
+                        self._tail[0] = first[excess:]
+                        self._tail_len -= excess
+            if self._spill:
+                try:
+                    self._spill.write(s)
+                except Exception:
+                    pass
+        return n
+
+    @property
+    def dropped(self):
+        return self.total - self._head_len - self._tail_len
+
+    @property
+    def truncated(self):
+        return self.dropped > 0
+
+    def _marker(self, dropped):
+        hint = f", full output in {self.spill_path}" if self.spill_path else ""
+        return f"\n... [{dropped} characters truncated{hint}] ...\n"
+
+    def read_from(self, offset=0):
+        """Returns (text, next_offset) for everything written since offset.
+
+        Characters that were already dropped are replaced by a marker.
+        """
+        with self._lock:
+            tail_start = self.total - self._tail_len
+            parts = []
+            if offset < self._head_len:
+                parts.append("".join(self._head)[offset:])
+                offset = self._head_len
+            if offset < tail_start:
+                parts.append(self._marker(tail_start - offset))
+                offset = tail_start
+            if offset < self.total:
+                parts.append("".join(self._tail)[offset - tail_start:])
+            return "".join(parts), self.total
+
+    def getvalue(self):
+        return self.read_from(0)[0]
+
+    def close(self):
+        if self._spill:
+            try:
+                self._spill.close()
+            except Exception:
+                pass
+            self._spill = None
+        super().close()
+
+
+class ScriptTimeout(BaseException):
+    """Raised inside a script that exceeded its execution budget.
+
+    Derives from BaseException so a generic `except Exception` in agent code
+    cannot swallow it. A bare `except:` can, so creating one (which happens in
+    the script's thread) also re-arms the running budget's hooks.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        budget = ExecutionBudget.running.get(threading.get_ident())
+        if budget is not None and budget.exceeded:
+            budget._enforce()
+
+
+class ExecutionBudget:
+    """Wall-clock and line budgets for a script run.
+
+    The wall-clock limit is enforced by a watchdog timer that raises
+    ScriptTimeout asynchronously in the executing thread, again every
+    BUDGET_REFIRE_INTERVAL until the script ends; the line limit by a trace
+    hook. Once a budget is exceeded, every line of the script raises, and a
+    profile hook turns line tracing back on whenever raising from it switched
+    tracing off, so the script cannot catch its way past the limit. Nothing is
+    installed until needed: unbudgeted scripts and scripts within a wall-clock
+    limit run without overhead. Time spent inside a single C call (e.g. a
+    heavy bpy.ops operator) cannot be interrupted; the timeout is raised as
+    soon as control returns to Python.
+    """
+
+    running = {} # Thread id -> budget of the script running on it
+
+    def __init__(self, timeout=None, max_lines=None):
+        self.timeout = float(timeout) if timeout else None
+        self.max_lines = int(max_lines) if max_lines else None
+        self.lines = 0
+        self.exceeded = None
+        self._lock = threading.Lock()
+        self._armed = False
+        self._timer = None
+        self._thread_id = None
+        self._previous = None
+        self._previous_profile = None
+        self._enforcing = False
+        self._keeping = False
+
+    @property
+    def active(self):
+        return bool(self.timeout or self.max_lines)
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._previous, self._previous_profile = sys.gettrace(), sys.getprofile()
+        if self.active:
+            ExecutionBudget.running[self._thread_id] = self
+        if self.timeout:
+            self._armed = True
+            self._schedule(self.timeout)
+        if self.max_lines:
+            sys.settrace(self._trace_call)
+        return self
+
+    def __exit__(self, *exc):
+        ExecutionBudget.running.pop(self._thread_id, None)
+        if self._keeping:
+            # A C profiler (cProfile) can't be reinstalled from Python; its owner disables it.
+            sys.setprofile(self._previous_profile if callable(self._previous_profile) else None)
+        if self.max_lines or self._enforcing:
+            sys.settrace(self._previous)
+        with self._lock:
+            self._armed = False
+            if self._timer:
+                self._timer.cancel()
+            if self.exceeded and not (exc[0] and issubclass(exc[0], ScriptTimeout)):
+                # Tripped as the script finished: swallow any undelivered exception here.
+                # Replacing it and taking delivery right away (clearing it with NULL
+                # would leave the interpreter's eval breaker set for good).
+                import ctypes
+                try:
+                    ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                        ctypes.c_ulong(self._thread_id), ctypes.py_object(ScriptTimeout))
+                    time.sleep(0)
+                except ScriptTimeout:
+                    pass
+        return False
+
+    def _schedule(self, delay):
+        self._timer = threading.Timer(delay, self._fire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _fire(self):
+        import ctypes
+        with self._lock:
+            if not self._armed:
+                return
+            self.exceeded = self.exceeded or f"wall-clock budget of {self.timeout:g}s"
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(self._thread_id), ctypes.py_object(ScriptTimeout))
+            self._schedule(BUDGET_REFIRE_INTERVAL) # In case the script catches it
+
+    def _enforce(self):
+        """Makes every line of the running script raise; called on the script's thread."""
+        self._enforcing = True
+        sys.settrace(self._trace_call)
+        # Script frames sit between the bridge frames above (hooks) and below (exec).
+        frame = sys._getframe(1)
+        while frame is not None and frame.f_code.co_filename == __file__:
+            frame = frame.f_back
+        while frame is not None and frame.f_code.co_filename != __file__:
+            frame.f_trace = self._trace_line
+            frame = frame.f_back
+        # An exception from a trace function switches tracing off; the profile
+        # hook switches it back on. It displaces a running ScriptProfiler, which
+        # then reports the script up to this point.
+        if not self._keeping:
+            self._keeping = True
+            sys.setprofile(self._keep_tracing)
+
+    def _keep_tracing(self, frame, event, arg):
+        if sys.gettrace() is None:
+            self._enforce()
+
+    def _trace_call(self, frame, event, arg):
+        # Bridge internals (e.g. output capture) don't count against the budget.
+        if frame.f_code.co_filename == __file__:
+            return None
+        return self._trace_line if self.max_lines or self.exceeded else None
+
+    def _trace_line(self, frame, event, arg):
+        if event == 'line':
+            if self.max_lines and not self.exceeded:
+                self.lines += 1
+                if self.lines > self.max_lines:
+                    self.exceeded = f"line budget of {self.max_lines}"
+            if self.exceeded:
+                raise ScriptTimeout(f"Script exceeded its {self.exceeded}")
+        return self._trace_line
+
+    def describe(self):
+        return {"timeout": self.timeout, "max_lines": self.max_lines,
+                "lines": self.lines if self.max_lines else None, "exceeded": self.exceeded}
+
+
+class ScriptProfiler:
+    """Optional cProfile and tracemalloc instrumentation for a script run."""
+
+    def __init__(self, cpu=False, memory=False, top=PROFILE_TOP_N):
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self._profile = None
+        self._snapshot = None
+        self._peak = None
+        self._started_tracemalloc = False
+
+    @classmethod
+    def from_option(cls, option):
+        """Accepts true, "cpu", "memory", "all" or {"cpu", "memory", "top"}."""
+        if not option:
+            return cls()
+        if isinstance(option, dict):
+            return cls(bool(option.get('cpu', True)), bool(option.get('memory', False)),
+                       int(option.get('top', PROFILE_TOP_N)))
+        if option == 'memory':
+            return cls(memory=True)
+        return cls(cpu=True, memory=option == 'all')
+
+    @property
+    def active(self):
+        return self.cpu or self.memory
+
+    def __enter__(self):
+        # Import before tracing starts so the imports don't show up in the report.
+        import cProfile
+        import tracemalloc
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+        if self.cpu:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        if self.cpu:
+            self._profile.disable()
+        if self.memory:
+            import tracemalloc
+            self._peak = tracemalloc.get_traced_memory()[1]
+            self._snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+        return False
+
+    def _cpu_report(self):
+        import pstats
+        stats = pstats.Stats(self._profile).stats
+        rows = []
+        for (filename, line, func), (cc, nc, tt, ct, callers) in stats.items():
+            # Skip the bridge's own frames and the exec()/disable() wrappers.
+            if filename == __file__ or func in ("<built-in method builtins.exec>", "<method 'disable' of '_lsprof.Profiler' objects>"):
+                continue
+            rows.append({
+                "function": func,
+                "file": filename,
+                "line": line,
+                "calls": nc,
+                "total_time": round(tt, 6),
+                "cumulative_time": round(ct, 6),
+            })
+        rows.sort(key=lambda r: r["cumulative_time"], reverse=True)
+        return rows[:self.top]
+
+    def _memory_report(self):
+        import tracemalloc
+        snapshot = self._snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        return {
+            "peak_kb": round(self._peak / 1024, 1),
+            "top_allocations": [{
+                "file": stat.traceback[0].filename,
+                "line": stat.traceback[0].lineno,
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            } for stat in snapshot.statistics('lineno')[:self.top]],
+        }
+
+    def report(self):
+        data = {}
+        try:
+            if self.cpu and self._profile:
+                data["cpu"] = self._cpu_report()
+            if self.memory and self._snapshot:
+                data["memory"] = self._memory_report()
+        except Exception as e:
+            data["error"] = f"Profiling failed: {e}"
+        return data
+
+
+class Execution:
+    """Output buffers and completion state for one script run."""
+
+    def __init__(self, spill=False):
+        self.id = secrets.token_hex(8)
+        self.stdout = BoundedOutput(spill_path=self._spill_path("stdout") if spill else None)
+        self.stderr = BoundedOutput(spill_path=self._spill_path("stderr") if spill else None)
+        self.done = threading.Event()
+        self.success = None
+        self.elapsed = None
+        self.budget = None
+        self.profile = None
+
+    def _spill_path(self, stream):
+        output_dir = data_path(OUTPUT_DIR_NAME)
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except Exception:
+            return None
+        return os.path.join(output_dir, f"{self.id}_{stream}.log")
+
+    def finish(self, success):
+        self.success = success
+        self.stdout.close()
+        self.stderr.close()
+        self.done.set()
+
+    def snapshot(self, stdout_offset=0, stderr_offset=0):
+        out, out_next = self.stdout.read_from(stdout_offset)
+        err, err_next = self.stderr.read_from(stderr_offset)
+        data = {
+            "id": self.id,
+            "done": self.done.is_set(),
+            "success": self.success,
+            "stdout": out,
+            "stderr": err,
+            "stdout_offset": out_next,
+            "stderr_offset": err_next,
+            "truncated": self.stdout.truncated or self.stderr.truncated,
+        }
+        data.update(self.summary())
+        if self.stdout.spill_path:
+            data["stdout_file"] = self.stdout.spill_path
+            data["stderr_file"] = self.stderr.spill_path
+        return data
+
+    def summary(self):
+        """Timing and budget details reported alongside the output."""
+        data = {"elapsed": self.elapsed}
+        if self.budget and self.budget.active:
+            data["budget"] = self.budget.describe()
+            data["timed_out"] = bool(self.budget.exceeded)
+        if self.profile:
+            data["profile"] = self.profile
+        return data
+
+    def discard(self):
+        for buf in (self.stdout, self.stderr):
+            if buf.spill_path and os.path.exists(buf.spill_path):
+                try:
+                    os.remove(buf.spill_path)
+                except Exception:
+                    pass
+
+
+class ExecutionLog:
+    """Recent executions that clients may still poll, oldest evicted first."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    def add(self, execution):
+        with self._lock:
+            self._entries[execution.id] = execution
+            while len(self._entries) > self.maxsize:
+                _, old = self._entries.popitem(last=False)
+                old.discard()
+
+    def get(self, exec_id):
+        with self._lock:
+            return self._entries.get(exec_id)
+
+
+EXECUTIONS = ExecutionLog(MAX_TRACKED_EXECUTIONS)
+
+# ==============================================================================
+# EXECUTION SESSIONS
+# ==============================================================================
+
+PRELOADED_MODULES = {}
+
+
+def preload_modules(names):
+    """Imports the given modules once so scripts don't pay for it per call."""
+    if isinstance(names, str):
+        names = [n.strip() for n in names.split(",")]
+    for name in names:
+        if not name or name in PRELOADED_MODULES:
+            continue
+        try:
+            PRELOADED_MODULES[name.rpartition('.')[2]] = importlib.import_module(name)
+        except Exception as e:
+            print(f"[Gemini] Could not preload module '{name}': {e}")
+
+
+def base_globals():
+    """Fresh globals for a script: bpy shortcuts plus the preloaded modules."""
+    if not PRELOADED_MODULES:
+        preload_modules(DEFAULT_PRELOAD_MODULES)
+    exec_globals = {"bpy": bpy, "C": bpy.context, "D": bpy.data}
+    exec_globals.update(PRELOADED_MODULES)
+    return exec_globals
+
+
+def estimate_size(obj, depth=2, _seen=None):
+    """Rough recursive sys.getsizeof; good enough to spot a bloated session."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen or isinstance(obj, type(sys)):
+        return 0
+    _seen.add(id(obj))
+    try:
+        size = sys.getsizeof(obj)
+    except Exception:
+        return 0
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += estimate_size(k, depth - 1, _seen) + estimate_size(v, depth - 1, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += estimate_size(item, depth - 1, _seen)
+    return size
+
+
+class ExecutionSession:
+    """A named, persistent globals dict shared by consecutive scripts."""
+
+    def __init__(self, name):
+        self.name = name
+        self.created = time.time()
+        self.reset()
+
+    def reset(self):
+        self.globals = base_globals()
+        self._builtin_names = set(self.globals) | {"__builtins__", "args"}
+        self.runs = 0
+        self.last_used = time.time()
+
+    def touch(self):
+        self.runs += 1
+        self.last_used = time.time()
+
+    def user_names(self):
+        return [k for k in self.globals if k not in self._builtin_names]
+
+    def describe(self):
+        user = {k: self.globals[k] for k in self.user_names()}
+        return {
+            "name": self.name,
+            "variables": sorted(user),
+            "memory_bytes": estimate_size(user),
+            "runs": self.runs,
+            "idle_seconds": round(time.time() - self.last_used, 1),
+        }
+
+
+class SessionManager:
+    """Holds execution sessions. Only touched from the main thread."""
+
+    def __init__(self, idle_timeout, max_sessions):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._last_sweep = 0.0
+
+    def get(self, name):
+        session = self._sessions.get(name)
+        if session is None:
+            if len(self._sessions) >= self.max_sessions:
+                oldest = min(self._sessions.values(), key=lambda s: s.last_used)
+                self.drop(oldest.name)
+            session = self._sessions[name] = ExecutionSession(name)
+        return session
+
+    def reset(self, name):
+        session = self._sessions.get(name)
+        if session:
+            session.reset()
+        return session is not None
+
+    def drop(self, name):
+        return self._sessions.pop(name, None) is not None
+
+    def evict_idle(self, now=None):
+        """Drops sessions idle for longer than idle_timeout. Cheap to call often."""
+        now = now or time.time()
+        if now - self._last_sweep < 10:
+            return
+        self._last_sweep = now
+        for name, session in list(self._sessions.items()):
+            if now - session.last_used > self.idle_timeout:
+                print(f"[Gemini] Evicting idle session '{name}'")
+                del self._sessions[name]
+
+    def describe(self):
+        return [s.describe() for s in self._sessions.values()]
+
+
+SESSIONS = SessionManager(SESSION_IDLE_TIMEOUT, MAX_SESSIONS)
+
+
+class RedrawScheduler:
+    """Coalesces 3D viewport redraws requested by scripts.
+
+    Scripts only mark a redraw as pending; flush() runs at the end of each
+    queue tick and tags the VIEW_3D areas at most once per min_interval.
+    """
+
+    def __init__(self, min_interval=DEFAULT_REDRAW_INTERVAL):
+        self.min_interval = min_interval
+        self.pending = False
+        self._last = 0.0
+
+    def request(self):
+        self.pending = True
+        METRICS.inc("gemini_redraws_requested_total")
+
+    def flush(self, now=None):
+        if not self.pending:
+            return False
+        now = now or time.perf_counter()
+        if now - self._last < self.min_interval:
+            return False # Still pending; a later tick picks it up
+        self.pending = False
+        self._last = now
+        if bpy.app.background:
+            return False # No windows to redraw
+        try:
+            for window in bpy.context.window_manager.windows:
+                for area in window.screen.areas:
+                    if area.type == 'VIEW_3D':
+                        area.tag_redraw()
+        except: pass
+        METRICS.inc("gemini_redraws_total")
+        return True
+
+
+REDRAW = RedrawScheduler()
+
+# ==============================================================================
+# BULK WRITES
+# ==============================================================================
+
+class BulkFailures:
+    """Collects per-object failures grouped by error message."""
+
+    def __init__(self):
+        self._errors = {}
+
+    def add(self, key, name, error):
+        entry = self._errors.setdefault(key, {}).setdefault(str(error), {"count": 0, "objects": []})
+        entry["count"] += 1
+        if name is not None and len(entry["objects"]) < BULK_ERROR_SAMPLES:
+            entry["objects"].append(name)
+
+    def report(self):
+        return {key: [{"error": msg, **entry} for msg, entry in errors.items()]
+                for key, errors in self._errors.items()}
+
+
+class BulkWriter:
+    """Writes transforms, visibility and GN modifier inputs to many objects at once.
+
+    Targets are a collection, a name pattern, a list of names, or a
+    combination (a pattern filters the collection). Property values are
+    either one value for every object or a flat array in target order; a
+    whole collection is written with foreach_set, other selections per
+    object. A modifier input value is always written to every object as is,
+    unless it is wrapped as {"per_object": [...]} (target order) or
+    {"by_name": {name: value}}, so a vector is never split by selection size.
+    """
+
+    _SKIP = object() # by_name entry for an object that isn't listed
+
+    @staticmethod
+    def resolve(collection=None, pattern=None, names=None, recursive=False):
+        """Returns (objects, bpy collection or None, missing names)."""
+        missing = []
+        if collection:
+            coll = bpy.data.collections.get(collection)
+            if coll is None:
+                raise KeyError(f"Collection '{collection}' not found")
+            source = coll.all_objects if recursive else coll.objects
+            if not pattern and not names:
+                return list(source), source, missing
+            objects = list(source)
+        elif names is not None:
+            objects = []
+            for name in names:
+                obj = bpy.data.objects.get(name)
+                if obj is None:
+                    missing.append(name)
+                else:
+                    objects.append(obj)
+        else:
+            objects = list(bpy.data.objects)
+        if collection and names is not None:
+            wanted = set(names)
+            objects = [o for o in objects if o.name in wanted]
+            missing = sorted(wanted - {o.name for o in objects})
+        if pattern:
+            objects = [o for o in objects if fnmatch.fnmatchcase(o.name, pattern)]
+        return objects, None, missing
+
+    @staticmethod
+    def _flat_values(prop, value, count):
+        """Expands value to a flat list of count * width items."""
+        width = BULK_PROPERTIES[prop]
+        if isinstance(value, (bool, int, float)):
+            value = [value]
+        value = list(value)
+        if value and isinstance(value[0], (list, tuple)):
+            value = [v for item in value for v in item] # [[x, y, z], ...] -> flat
+        if len(value) == width and count != 1:
+            value = value * count # One value for every object
+        if len(value) != width * count:
+            raise ValueError(f"'{prop}' needs {width} or {width * count} values, got {len(value)}")
+        return value
+
+    @staticmethod
+    def _per_object(value, objects):
+        """Splits a modifier input value into one value per object; _SKIP leaves an object untouched."""
+        count = len(objects)
+        if not isinstance(value, dict):
+            return [value] * count
+        if "per_object" in value:
+            values = value["per_object"]
+            if not isinstance(values, (list, tuple)) or len(values) != count:
+                raise ValueError(f"'per_object' needs {count} values (one per object in target order)")
+            return list(values)
+        if "by_name" in value:
+            by_name = value["by_name"]
+            if not isinstance(by_name, dict):
+                raise ValueError("'by_name' must map object names to values")
+            return [by_name.get(obj.name, BulkWriter._SKIP) for obj in objects]
+        if "value" in value:
+            return [value["value"]] * count
+        raise ValueError("Expected a value, or {'value'|'per_object'|'by_name': ...}")
+
+    @staticmethod
+    def apply(objects, source=None, properties=None, modifier_inputs=None, modifier=None):
+        """Writes properties and modifier inputs; returns a compact report."""
+        failures = BulkFailures()
+        written, vectorized = {}, []
+        count = len(objects)
+
+        for prop, value in (properties or {}).items():
+            if prop not in BULK_PROPERTIES:
+                failures.add(prop, None, f"Unsupported property (supported: {', '.join(BULK_PROPERTIES)})")
+                continue
+            try:
+                flat = BulkWriter._flat_values(prop, value, count)
+            except (TypeError, ValueError) as e:
+                failures.add(prop, None, e)
+                continue
+            if source is not None and count:
+                try:
+                    source.foreach_set(prop, flat)
+                    written[prop] = count
+                    vectorized.append(prop)
+                    continue
+                except Exception as e:
+                    print(f"[Gemini] foreach_set('{prop}') failed, writing per object: {e}")
+            width = BULK_PROPERTIES[prop]
+            ok = 0
+            for i, obj in enumerate(objects):
+                try:
+                    setattr(obj, prop, flat[i] if width == 1 else flat[i * width:(i + 1) * width])
+                    ok += 1
+                except Exception as e:
+                    failures.add(prop, obj.name, e)
+            written[prop] = ok
+
+        for key, value in (modifier_inputs or {}).items():
+            try:
+                values = BulkWriter._per_object(value, objects)
+            except ValueError as e:
+                failures.add(key, None, e)
+                continue
+            ok = 0
+            for obj, item in zip(objects, values):
+                if item is BulkWriter._SKIP:
+                    continue
+                try:
+                    mod = obj.modifiers.get(modifier) if modifier else next(
+                        (m for m in obj.modifiers if m.type == 'NODES'), None)
+                    if mod is None:
+                        raise LookupError(f"No modifier '{modifier}'" if modifier else "No Geometry Nodes modifier")
+                    mod[key] = item
+                    ok += 1
+                except Exception as e:
+                    failures.add(key, obj.name, e)
+            written[key] = ok
+
+        # foreach_set and ID property writes don't tag the depsgraph themselves.
+        if written:
+            for obj in objects:
+                try:
+                    obj.update_tag()
+                except Exception:
+                    pass
+        return {"count": count, "written": written, "vectorized": vectorized, "failures": failures.report()}
+
+
 # ==============================================================================
 # CORE BRIDGE LOGIC
 # ==============================================================================
@@ -153,38 +1267,83 @@ class BridgeCore:
     """Business logic for the Bridge."""
     
     @staticmethod
-    def execute_python(code):
+    def execute_python(code, args=None, session=None, execution=None, budget=None, profiler=None, redraw=True):
+        """Runs code (source or a compiled code object) on the main thread.
+
+        args, if given, is exposed to the script as the global `args`. With a
+        session name, globals persist across calls made with the same name.
+        Output goes to the bounded buffers of execution (a new one if None),
+        an ExecutionBudget, if given, aborts the script when exceeded, and a
+        ScriptProfiler attaches a cProfile/tracemalloc report to execution.
+        With redraw, a coalesced viewport redraw is requested afterwards.
+        """
+        execution = execution or Execution()
+        execution.budget = budget = budget or ExecutionBudget()
+        profiler = profiler or ScriptProfiler()
+        stdout_capture, stderr_capture = execution.stdout, execution.stderr
         old_stdout, old_stderr = sys.stdout, sys.stderr
-        sys.stdout = stdout_capture = io.StringIO()
-        sys.stderr = stderr_capture = io.StringIO()
+        sys.stdout, sys.stderr = stdout_capture, stderr_capture
         
         success = False
+        start = time.perf_counter()
         try:
-            # Provide a standard environment
-            exec_globals = {"bpy": bpy, "C": bpy.context, "D": bpy.data}
-            try:
-                import math
-                import random
-                exec_globals["math"] = math
-                exec_globals["random"] = random
-            except: pass
+            if session:
+                exec_session = SESSIONS.get(session)
+                exec_session.touch()
+                exec_globals = exec_session.globals
+            else:
+                exec_globals = base_globals()
+            exec_globals["args"] = args or {}
             
-            exec(code, exec_globals)
+            with profiler, budget:
+                exec(code, exec_globals)
+            if budget.exceeded:
+                raise ScriptTimeout() # Tripped, but the script caught it
             success = True
+        except ScriptTimeout:
+            # Output printed before the budget tripped is kept.
+            print(f"ScriptTimeout: Script exceeded its {budget.exceeded}", file=stderr_capture)
         except Exception:
             traceback.print_exc(file=stderr_capture)
         finally:
             sys.stdout, sys.stderr = old_stdout, old_stderr
+            execution.elapsed = round(time.perf_counter() - start, 4)
+            if profiler.active:
+                execution.profile = profiler.report()
             
-        # Force redraw of all 3D views
-        try:
-            for window in bpy.context.window_manager.windows:
-                for area in window.screen.areas:
-                    if area.type == 'VIEW_3D':
-                        area.tag_redraw()
-        except: pass
+        SCENE_CHANGES.touch()
+        if redraw:
+            REDRAW.request()
                 
-        return success, stdout_capture.getvalue(), stderr_capture.getvalue()
+        out, err = stdout_capture.getvalue(), stderr_capture.getvalue()
+        execution.finish(success)
+        return success, out, err
+
+    @staticmethod
+    def execute_batch(scripts, session=None, budget_factory=None, profiler_factory=None, stop_on_error=True, redraw=True):
+        """Runs several scripts in one main-thread pass.
+
+        Each entry is either source code or {"code": ..., "args": ...}.
+        Returns a list of (Execution, success) pairs; scripts after the first
+        failure are skipped when stop_on_error is set. The viewport is
+        redrawn once for the whole batch (never without redraw).
+        """
+        results = []
+        for entry in scripts:
+            if isinstance(entry, dict):
+                code, args = entry.get('code', ''), entry.get('args')
+            else:
+                code, args = entry, None
+            execution = Execution()
+            budget = budget_factory() if budget_factory else None
+            profiler = profiler_factory() if profiler_factory else None
+            success, _, _ = BridgeCore.execute_python(code, args, session, execution, budget, profiler, redraw=False)
+            results.append((execution, success))
+            if stop_on_error and not success:
+                break
+        if redraw and results:
+            REDRAW.request()
+        return results
 
     @staticmethod
     def inspect_active_graph():
@@ -237,8 +1396,76 @@ class BridgeCore:
             
         return data
 
+    @staticmethod
+    def find_node_tree(name=None):
+        """Returns the node group called name, or the active object's Geometry Nodes tree."""
+        if name:
+            return bpy.data.node_groups.get(name)
+        obj = bpy.context.active_object
+        if not obj:
+            return None
+        tree = None
+        for mod in obj.modifiers:
+            if mod.type == 'NODES' and mod.node_group:
+                tree = mod.node_group
+                if mod.is_active: break
+        return tree
+
+    @staticmethod
+    def apply_graph(target, tree_name=None, remove_missing=True, dry_run=False):
+        node_tree = BridgeCore.find_node_tree(tree_name)
+        if node_tree is None:
+            return {"error": f"Node tree '{tree_name}' not found" if tree_name
+                    else "Active object has no Geometry Nodes modifier. Please create one."}
+        changeset = GraphReconciler.apply(node_tree, target, remove_missing, dry_run)
+        if changeset["changes"] and not dry_run:
+            SCENE_CHANGES.touch()
+            REDRAW.request()
+        return changeset
+
+    @staticmethod
+    def set_objects(payload):
+        start = time.perf_counter()
+        try:
+            objects, source, missing = BulkWriter.resolve(
+                payload.get('collection'), payload.get('pattern'), payload.get('names'),
+                bool(payload.get('recursive')))
+        except KeyError as e:
+            return {"error": str(e.args[0])}
+        if payload.get('dry_run'):
+            return {"count": len(objects), "objects": [o.name for o in objects], "missing": missing}
+        result = BulkWriter.apply(objects, source, payload.get('properties'),
+                                  payload.get('modifier_inputs'), payload.get('modifier'))
+        if missing:
+            result["missing"] = missing
+        if result["written"]:
+            SCENE_CHANGES.touch()
+            if payload.get('redraw', True):
+                REDRAW.request()
+        result["elapsed"] = round(time.perf_counter() - start, 4)
+        return result
+
+    @staticmethod
+    def checkpoint(action, name=None):
+        """Runs a CHECKPOINTS action, turning failures into an error dict with an HTTP status."""
+        try:
+            return action(name)
+        except KeyError as e:
+            return {"error": e.args[0], "status": 404}
+        except ValueError as e:
+            return {"error": str(e), "status": 400}
+        except UnsavedChanges as e:
+            return {"error": str(e), "unsaved_changes": True, "status": 409}
+        except PermissionError as e:
+            return {"error": str(e), "status": 409}
+        except Exception as e:
+            traceback.print_exc()
+            return {"error": f"{type(e).__name__}: {e}", "status": 500}
+
     @staticmethod
     def capture_screenshot():
+        import base64
+        import tempfile
         try:
             fd, path = tempfile.mkstemp(suffix=".png")
             os.close(fd)
@@ -288,6 +1515,256 @@ class BridgeCore:
             print(f"Write Error {filepath}: {e}")
             return False
 
+# ==============================================================================
+# TOOL REGISTRY
+# ==============================================================================
+
+# Tools provided by the web app itself; never listed as custom tools.
+SYSTEM_TOOL_NAMES = frozenset([
+    'remember', 'create_tool', 'run_tool', 'inspect_graph', 'apply_graph', 'set_objects',
+    'save_checkpoint', 'restore_checkpoint',
+    'get_screenshot', 'execute_code', 'search_knowledge_base',
+    'qdrant_list_collections', 'qdrant_create_collection',
+    'qdrant_delete_collection', 'qdrant_add_knowledge'
+])
+
+
+class ToolRegistry:
+    """In-memory index of custom tools, backed by the tools JSON file.
+
+    The file is parsed once and re-read only when its mtime changes (e.g. it
+    was edited by hand). Mutations update the index immediately and are
+    persisted on a background thread, so lookups never touch the disk.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._path = None
+        self._lock = threading.RLock()
+        self._by_trigger = {}   # trigger -> tool (insertion ordered)
+        self._by_name = {}      # name -> tool
+        self._custom = None     # cached list of non-system tools
+        self._mtime = None
+        self._loaded = False
+        self._save_pending = False
+        self._writer = None
+
+    @property
+    def path(self):
+        if self._path is None:
+            self._path = data_path(self.filename)
+        return self._path
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _refresh(self):
+        """Reloads from disk if the file changed behind our back."""
+        mtime = self._file_mtime()
+        if self._loaded and mtime == self._mtime:
+            return
+        # Unsaved in-memory changes are newer than whatever is on disk.
+        if self._writer is not None:
+            return
+        tools = []
+        if mtime is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    tools = json.load(f)
+                if not isinstance(tools, list):
+                    tools = []
+            except Exception as e:
+                print(f"[Gemini] Error reading tools file: {e}")
+                tools = []
+        self._by_trigger = {}
+        self._by_name = {}
+        for tool in tools:
+            if isinstance(tool, dict):
+                self._index(tool)
+        self._custom = None
+        self._mtime = mtime
+        self._loaded = True
+
+    def _index(self, tool):
+        old = self._by_trigger.pop(tool.get('trigger'), None)
+        if old is not None and self._by_name.get(old.get('name')) is old:
+            del self._by_name[old.get('name')]
+        self._by_trigger[tool.get('trigger')] = tool
+        self._by_name[tool.get('name')] = tool
+
+    def get(self, trigger):
+        with self._lock:
+            self._refresh()
+            return self._by_trigger.get(trigger)
+
+    def get_by_name(self, name):
+        with self._lock:
+            self._refresh()
+            return self._by_name.get(name)
+
+    def custom_tools(self):
+        """Returns all tools except the web app's built-in ones."""
+        with self._lock:
+            self._refresh()
+            if self._custom is None:
+                self._custom = [t for t in self._by_trigger.values()
+                                if t.get('name') not in SYSTEM_TOOL_NAMES]
+            return self._custom
+
+    def put(self, tool):
+        """Adds or replaces a tool. Raises SyntaxError if its code is invalid."""
+        code = tool.get('code')
+        if isinstance(code, str):
+            # Compile at save time: validates syntax and warms the cache for /tools/run.
+            CODE_CACHE.compile(code, f"<tool {tool.get('trigger')}>")
+        with self._lock:
+            self._refresh()
+            self._index(tool)
+            self._custom = None
+            self._schedule_save()
+
+    def remove(self, trigger):
+        with self._lock:
+            self._refresh()
+            tool = self._by_trigger.pop(trigger, None)
+            if tool is None:
+                return False
+            if self._by_name.get(tool.get('name')) is tool:
+                del self._by_name[tool.get('name')]
+            self._custom = None
+            self._schedule_save()
+            return True
+
+    def _schedule_save(self):
+        self._save_pending = True
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            with self._lock:
+                if not self._save_pending:
+                    self._writer = None
+                    return
+                self._save_pending = False
+                content = json.dumps(list(self._by_trigger.values()), indent=2)
+            # Write outside the lock; bursts of mutations coalesce into one write.
+            if BridgeCore.write_file(self.path, content):
+                with self._lock:
+                    self._mtime = self._file_mtime()
+
+    def flush(self, timeout=5.0):
+        """Blocks until pending writes have reached the disk."""
+        writer = self._writer
+        if writer is not None:
+            writer.join(timeout)
+
+
+TOOL_REGISTRY = ToolRegistry(TOOLS_FILE_NAME)
+
+# ==============================================================================
+# METRICS
+# ==============================================================================
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Thread-safe counters and histograms, rendered in Prometheus text format.
+
+    Recording is a dict lookup and a bisect under a lock; all formatting
+    happens at scrape time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self.started = time.time()
+
+    @staticmethod
+    def endpoint(path):
+        """Maps a request path to its route label, or "other" for unknown paths."""
+        path = path.split('?', 1)[0]
+        return path if path in ENDPOINT_LABELS else "other"
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(buckets)
+            hist.observe(value)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    @staticmethod
+    def _labels(labels, extra=()):
+        items = list(labels) + list(extra)
+        if not items:
+            return ""
+        escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in items)
+        return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+    def render(self, gauges=None):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda kv: kv[0])
+            snapshot = [(key, list(h.counts), h.sum, h.count, h.buckets) for key, h in histograms]
+
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{self._labels(labels)} {value}")
+        for (name, labels), counts, total, count, buckets in snapshot:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, n in zip(buckets, counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{self._labels(labels, [('le', repr(float(bound)))])} {cumulative}")
+            lines.append(f"{name}_bucket{self._labels(labels, [('le', '+Inf')])} {count}")
+            lines.append(f"{name}_sum{self._labels(labels)} {total}")
+            lines.append(f"{name}_count{self._labels(labels)} {count}")
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+def metrics_gauges():
+    return {
+        "gemini_queue_depth": EXECUTION_QUEUE.qsize(),
+        "gemini_active_threads": threading.active_count(),
+        "gemini_uptime_seconds": round(time.time() - METRICS.started, 1),
+    }
+
 # ==============================================================================
 # HTTP SERVER
 # ==============================================================================
@@ -295,21 +1772,46 @@ class BridgeCore:
 EXECUTION_QUEUE = queue.Queue()
 
 class RequestHandler(http.server.BaseHTTPRequestHandler):
+    _status = None
+
     def log_message(self, format, *args): pass # Silence logs
 
-    def _send(self, status, data, is_json=True):
+    def handle_one_request(self):
+        self._status = None
+        start = time.perf_counter()
+        super().handle_one_request()
+        if self._status is not None and self.command != 'OPTIONS':
+            # A malformed request line is answered before path/command are parsed.
+            endpoint = METRICS.endpoint(getattr(self, 'path', ''))
+            method = self.command if self.command in METHOD_LABELS else "other"
+            METRICS.observe("gemini_request_duration_seconds", time.perf_counter() - start,
+                            endpoint=endpoint, method=method)
+            METRICS.inc("gemini_requests_total", endpoint=endpoint, method=method, status=self._status)
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def _send(self, status, data, is_json=True, content_type=None):
         try:
             self.send_response(status)
             self.send_header('Access-Control-Allow-Origin', '*')
+            encode_start = time.perf_counter()
             if is_json:
                 self.send_header('Content-type', 'application/json')
                 if not isinstance(data, str):
                     data = json.dumps(data, cls=BlenderJSONEncoder)
             else:
-                self.send_header('Content-type', 'text/plain')
+                self.send_header('Content-type', content_type or 'text/plain')
+            body = data.encode('utf-8')
+            write_start = time.perf_counter()
                 
             self.end_headers()
-            self.wfile.write(data.encode('utf-8'))
+            self.wfile.write(body)
+            endpoint = METRICS.endpoint(self.path)
+            METRICS.observe("gemini_encode_seconds", write_start - encode_start, endpoint=endpoint)
+            METRICS.observe("gemini_write_seconds", time.perf_counter() - write_start, endpoint=endpoint)
+            METRICS.observe("gemini_response_bytes", len(body), SIZE_BUCKETS, endpoint=endpoint)
         except BrokenPipeError:
             pass
         except Exception as e:
@@ -324,29 +1826,125 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
 
     def _authorized(self):
         token = self.headers.get('X-Blender-Token', '')
+        if not token:
+            # Prometheus scrapers can only send a bearer token.
+            auth = self.headers.get('Authorization', '')
+            if auth.startswith('Bearer '):
+                token = auth[7:].strip()
         if token == SERVER_TOKEN:
             return True
         self._send(401, {'error': 'Invalid or missing token'})
         return False
 
-    def _queue_task(self, task_func):
-        container = {'done': False, 'result': None}
+    def _enqueue(self, task_func):
+        container = {'done': False, 'result': None, 'event': threading.Event()}
+        endpoint = METRICS.endpoint(self.path)
+        queued = time.perf_counter()
         def wrapped_task():
+            started = time.perf_counter()
+            METRICS.observe("gemini_queue_wait_seconds", started - queued, endpoint=endpoint)
             try:
                 container['result'] = task_func()
             except Exception as e:
                 print(f"[Gemini] Task Error: {e}")
                 container['result'] = None
+            METRICS.observe("gemini_main_thread_seconds", time.perf_counter() - started, endpoint=endpoint)
             container['done'] = True
+            container['event'].set()
         EXECUTION_QUEUE.put(wrapped_task)
-        
-        timeout = 15 # Increased timeout for heavy tasks
-        start = time.time()
-        while not container['done']:
-            if time.time() - start > timeout: return None
-            time.sleep(0.01)
+        return container
+
+    def _queue_task(self, task_func, timeout=15):
+        container = self._enqueue(task_func)
+        if not container['event'].wait(timeout):
+            METRICS.inc("gemini_queue_timeouts_total", endpoint=METRICS.endpoint(self.path))
+            return None
         return container['result']
 
+    def _stream_execution(self, execution):
+        """Writes output as NDJSON lines while the script runs, then a final summary."""
+        try:
+            self.send_response(200)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-type', 'application/x-ndjson')
+            self.end_headers()
+            offsets = {'stdout': 0, 'stderr': 0}
+            while True:
+                finished = execution.done.wait(STREAM_POLL_INTERVAL)
+                for name in ('stdout', 'stderr'):
+                    text, offsets[name] = getattr(execution, name).read_from(offsets[name])
+                    if text:
+                        self.wfile.write((json.dumps({'stream': name, 'data': text}) + '\n').encode('utf-8'))
+                self.wfile.flush()
+                if finished:
+                    break
+            summary = {'done': True, 'id': execution.id, 'success': execution.success,
+                       'truncated': execution.stdout.truncated or execution.stderr.truncated}
+            summary.update(execution.summary())
+            self.wfile.write((json.dumps(summary) + '\n').encode('utf-8'))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    @staticmethod
+    def _budget(payload):
+        return ExecutionBudget(payload.get('timeout'), payload.get('max_lines'))
+
+    @staticmethod
+    def _profiler(payload):
+        return ScriptProfiler.from_option(payload.get('profile'))
+
+    def _send_context(self, params):
+        """Shared by GET (query string) and POST (JSON) /context."""
+        try:
+            sections = params.get('sections')
+            if isinstance(sections, str):
+                sections = [s.strip() for s in sections.split(',') if s.strip()]
+            max_chars = int(params['max_chars']) if params.get('max_chars') else None
+            max_tokens = int(params['max_tokens']) if params.get('max_tokens') else None
+        except (TypeError, ValueError):
+            self._send(400, {'error': 'Invalid budget'})
+            return
+        unknown = [s for s in sections or () if s not in CONTEXT_SECTIONS]
+        if unknown:
+            self._send(400, {'error': f"Unknown sections {unknown}; available: {list(CONTEXT_SECTIONS)}"})
+            return
+        result = self._queue_task(lambda: CONTEXT.build(sections, max_chars, max_tokens, params.get('query') or ''))
+        if result is None:
+            self._send(504, {'error': 'Timed out waiting for Blender'})
+        else:
+            self._send(200, result)
+
+    def _run_execution(self, payload, task_func, execution):
+        """Runs an execution task honouring the async/stream output options."""
+        if payload.get('async'):
+            EXECUTIONS.add(execution)
+            self._enqueue(task_func)
+            self._send(202, {'id': execution.id})
+        elif payload.get('stream'):
+            EXECUTIONS.add(execution)
+            self._enqueue(task_func)
+            self._stream_execution(execution)
+        else:
+            if execution.stdout.spill_path:
+                EXECUTIONS.add(execution)
+            timeout = 15
+            if execution.budget and execution.budget.timeout:
+                timeout = max(timeout, execution.budget.timeout + QUEUE_WAIT_GRACE)
+            outcome = self._queue_task(task_func, timeout)
+            if outcome is None:
+                EXECUTIONS.add(execution)
+                self._send(504, {'success': False, 'id': execution.id, 'stdout': '', 'stderr': '',
+                                 'error': 'Timed out waiting for Blender. Poll /execute/output with the id for the result.'})
+                return
+            success, out, err = outcome
+            result = {'success': success, 'stdout': out, 'stderr': err,
+                      'truncated': execution.stdout.truncated or execution.stderr.truncated}
+            result.update(execution.summary())
+            if execution.stdout.spill_path:
+                result['stdout_file'] = execution.stdout.spill_path
+                result['stderr_file'] = execution.stderr.spill_path
+            self._send(200, result)
+
     def do_OPTIONS(self):
         self.send_response(200)
         self.send_header('Access-Control-Allow-Origin', '*')
@@ -359,8 +1957,12 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
             return
         if self.path == '/':
             self._send(200, "Gemini Bridge Online V2.1.2", False)
+        elif self.path == '/instances':
+            self._send(200, INSTANCES.list())
+        elif self.path == '/metrics':
+            self._send(200, METRICS.render(metrics_gauges()), False, 'text/plain; version=0.0.4; charset=utf-8')
         elif self.path == '/history':
-            data = self._queue_task(lambda: BridgeCore.read_file(HISTORY_FILE, "[]"))
+            data = self._queue_task(lambda: BridgeCore.read_file(data_path(HISTORY_FILE_NAME), "[]"))
             self._send(200, data, is_json=True)
         elif self.path == '/inspect':
             data = self._queue_task(BridgeCore.inspect_active_graph)
@@ -368,28 +1970,33 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
         elif self.path == '/screenshot':
             b64 = self._queue_task(BridgeCore.capture_screenshot)
             self._send(200, {'success': bool(b64), 'image': b64})
-        elif self.path in ['/memory', '/tools']:
-            path = MEMORY_FILE if self.path == '/memory' else TOOLS_FILE
-            default = "[]" if self.path == '/tools' else ""
-            content = BridgeCore.read_file(path, default)
-            
-            if self.path == '/tools':
-                # Filter out system tools from the UI response
-                try:
-                    tools = json.loads(content)
-                    system_tool_names = [
-                        'remember', 'create_tool', 'run_tool', 'inspect_graph', 
-                        'get_screenshot', 'execute_code', 'search_knowledge_base',
-                        'qdrant_list_collections', 'qdrant_create_collection', 
-                        'qdrant_delete_collection', 'qdrant_add_knowledge'
-                    ]
-                    # Filter by name (or trigger if name is ambiguous)
-                    filtered_tools = [t for t in tools if t.get('name') not in system_tool_names]
-                    self._send(200, filtered_tools, is_json=True)
-                except:
-                    self._send(200, [], is_json=True)
-            else:
-                self._send(200, content, is_json=False)
+        elif self.path == '/tools':
+            self._send(200, TOOL_REGISTRY.custom_tools(), is_json=True)
+        elif self.path.startswith('/execute/output'):
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+            execution = EXECUTIONS.get(query.get('id', [''])[0])
+            if not execution:
+                self._send(404, {'error': 'Unknown execution id'})
+                return
+            try:
+                stdout_offset = int(query.get('stdout_offset', ['0'])[0])
+                stderr_offset = int(query.get('stderr_offset', ['0'])[0])
+            except ValueError:
+                self._send(400, {'error': 'Invalid offset'})
+                return
+            self._send(200, execution.snapshot(stdout_offset, stderr_offset))
+        elif self.path == '/context' or self.path.startswith('/context?'):
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+            self._send_context({k: v[0] for k, v in query.items()})
+        elif self.path == '/checkpoints':
+            data = self._queue_task(CHECKPOINTS.describe)
+            self._send(200, data)
+        elif self.path == '/sessions':
+            data = self._queue_task(SESSIONS.describe)
+            self._send(200, data or [])
+        elif self.path == '/memory':
+            content = BridgeCore.read_file(data_path(MEMORY_FILE_NAME), "")
+            self._send(200, content, is_json=False)
 
     def do_POST(self):
         if not self._authorized():
@@ -399,35 +2006,148 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
             try:
                 payload = json.loads(data)
                 code = payload.get('code', '')
-                success, out, err = self._queue_task(lambda: BridgeCore.execute_python(code))
-                self._send(200, {'success': success, 'stdout': out, 'stderr': err})
+                session = payload.get('session')
+                if session and payload.get('reset_session'):
+                    self._queue_task(lambda: SESSIONS.reset(session))
+                execution = Execution(spill=bool(payload.get('spill')))
+                execution.budget = budget = self._budget(payload)
+                profiler = self._profiler(payload)
+                redraw = payload.get('redraw', True)
+                self._run_execution(payload, lambda: BridgeCore.execute_python(code, session=session, execution=execution, budget=budget, profiler=profiler, redraw=redraw), execution)
+            except:
+                self._send(400, {'error': 'Invalid Request'})
+        elif self.path == '/execute/batch':
+            try:
+                payload = json.loads(data)
+                scripts = payload.get('scripts') or []
+                session = payload.get('session')
+                timeout = 15
+                if payload.get('timeout'):
+                    timeout += float(payload['timeout']) * len(scripts)
+                results = self._queue_task(lambda: BridgeCore.execute_batch(
+                    scripts, session,
+                    budget_factory=lambda: self._budget(payload),
+                    profiler_factory=lambda: self._profiler(payload),
+                    stop_on_error=payload.get('stop_on_error', True),
+                    redraw=payload.get('redraw', True)), timeout)
+                if results is None:
+                    self._send(504, {'success': False, 'error': 'Timed out waiting for Blender'})
+                    return
+                items = []
+                for execution, success in results:
+                    item = {'success': success, 'stdout': execution.stdout.getvalue(),
+                            'stderr': execution.stderr.getvalue(),
+                            'truncated': execution.stdout.truncated or execution.stderr.truncated}
+                    item.update(execution.summary())
+                    items.append(item)
+                self._send(200, {'success': len(items) == len(scripts) and all(i['success'] for i in items),
+                                 'results': items})
+            except:
+                self._send(400, {'error': 'Invalid Request'})
+        elif self.path == '/graph/apply':
+            try:
+                payload = json.loads(data)
+                target = payload.get('graph')
+                if not isinstance(target, dict):
+                    self._send(400, {'error': "Missing 'graph'"})
+                    return
+                result = self._queue_task(lambda: BridgeCore.apply_graph(
+                    target, payload.get('tree'),
+                    remove_missing=payload.get('remove_missing', True),
+                    dry_run=payload.get('dry_run', False)))
+                if result is None:
+                    self._send(504, {'error': 'Timed out waiting for Blender'})
+                else:
+                    self._send(404 if 'error' in result else 200, result)
+            except:
+                self._send(400, {'error': 'Invalid Request'})
+        elif self.path == '/objects/set':
+            try:
+                payload = json.loads(data)
+                if not (payload.get('collection') or payload.get('pattern') or payload.get('names') is not None):
+                    self._send(400, {'error': "Give a 'collection', 'pattern' or 'names'"})
+                    return
+                result = self._queue_task(lambda: BridgeCore.set_objects(payload))
+                if result is None:
+                    self._send(504, {'error': 'Timed out waiting for Blender'})
+                else:
+                    self._send(404 if 'error' in result else 200, result)
+            except:
+                self._send(400, {'error': 'Invalid Request'})
+        elif self.path == '/tools/run':
+            try:
+                payload = json.loads(data)
+                tool = TOOL_REGISTRY.get(payload.get('trigger'))
+                if not tool:
+                    self._send(404, {'success': False, 'error': f"Tool '{payload.get('trigger')}' not found"})
+                    return
+                code = CODE_CACHE.compile(tool.get('code', ''), f"<tool {tool.get('trigger')}>")
+                args = payload.get('args') or {}
+                session = payload.get('session')
+                execution = Execution(spill=bool(payload.get('spill')))
+                execution.budget = budget = self._budget(payload)
+                profiler = self._profiler(payload)
+                redraw = payload.get('redraw', True)
+                self._run_execution(payload, lambda: BridgeCore.execute_python(code, args, session, execution, budget, profiler, redraw), execution)
+            except SyntaxError as e:
+                self._send(200, {'success': False, 'stdout': '', 'stderr': format_syntax_error(e)})
+            except:
+                self._send(400, {'error': 'Invalid Request'})
+        elif self.path == '/context':
+            try:
+                params = json.loads(data or "{}")
+                if not isinstance(params, dict):
+                    raise ValueError
+            except:
+                self._send(400, {'error': 'Invalid Request'})
+                return
+            self._send_context(params)
+        elif self.path in ('/checkpoint', '/restore'):
+            try:
+                payload = json.loads(data or "{}")
+                name, force = payload.get('name'), bool(payload.get('force'))
+            except:
+                self._send(400, {'error': 'Invalid Request'})
+                return
+            if self.path == '/checkpoint':
+                action = CHECKPOINTS.save
+            else:
+                action = lambda name: CHECKPOINTS.restore(name, force)
+            result = self._queue_task(lambda: BridgeCore.checkpoint(action, name), CHECKPOINT_TIMEOUT)
+            if result is None:
+                self._send(504, {'error': 'Timed out waiting for Blender'})
+            else:
+                self._send(result.pop('status', 200), result)
+        elif self.path == '/sessions/reset':
+            try:
+                name = json.loads(data).get('name')
+                found = self._queue_task(lambda: SESSIONS.reset(name))
+                self._send(200 if found else 404, {'success': bool(found)})
             except:
                 self._send(400, {'error': 'Invalid Request'})
         elif self.path == '/history':
-            self._queue_task(lambda: BridgeCore.write_file(HISTORY_FILE, data))
+            self._queue_task(lambda: BridgeCore.write_file(data_path(HISTORY_FILE_NAME), data))
             self._send(200, {'success': True})
         elif self.path == '/memory':
+            memory_file = data_path(MEMORY_FILE_NAME)
             current = []
-            if os.path.exists(MEMORY_FILE):
+            if os.path.exists(memory_file):
                 try:
-                    with open(MEMORY_FILE, 'r', encoding='utf-8') as f: current = f.readlines()
+                    with open(memory_file, 'r', encoding='utf-8') as f: current = f.readlines()
                 except: pass
             if data: current.extend((data + '\n').splitlines(keepends=True))
             if len(current) > 250: current = current[-250:]
-            self._queue_task(lambda: BridgeCore.write_file(MEMORY_FILE, "".join(current)))
+            self._queue_task(lambda: BridgeCore.write_file(memory_file, "".join(current)))
             self._send(200, {'success': True})
         elif self.path == '/tools':
             try:
                 new_tool = json.loads(data)
-                tools = []
-                if os.path.exists(TOOLS_FILE):
-                    try:
-                        with open(TOOLS_FILE, 'r', encoding='utf-8') as f: tools = json.load(f)
-                    except: pass
-                tools = [t for t in tools if t.get('trigger') != new_tool.get('trigger')]
-                tools.append(new_tool)
-                self._queue_task(lambda: BridgeCore.write_file(TOOLS_FILE, json.dumps(tools, indent=2)))
+                if not isinstance(new_tool, dict):
+                    raise ValueError("Tool must be a JSON object")
+                TOOL_REGISTRY.put(new_tool)
                 self._send(200, {'success': True})
+            except SyntaxError as e:
+                self._send(400, {'success': False, 'error': format_syntax_error(e)})
             except:
                 self._send(400, {'error': 'Invalid JSON'})
 
@@ -436,7 +2156,7 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
             return
         data = self._read_body()
         if self.path == '/memory':
-            self._queue_task(lambda: BridgeCore.write_file(MEMORY_FILE, data))
+            self._queue_task(lambda: BridgeCore.write_file(data_path(MEMORY_FILE_NAME), data))
             self._send(200, {'success': True})
 
     def do_DELETE(self):
@@ -445,13 +2165,584 @@ class RequestHandler(http.server.BaseHTTPRequestHandler):
         if self.path == '/tools':
             try:
                 trigger = json.loads(self._read_body()).get('trigger')
-                if os.path.exists(TOOLS_FILE):
-                    with open(TOOLS_FILE, 'r', encoding='utf-8') as f: tools = json.load(f)
-                    tools = [t for t in tools if t.get('trigger') != trigger]
-                    self._queue_task(lambda: BridgeCore.write_file(TOOLS_FILE, json.dumps(tools, indent=2)))
+                TOOL_REGISTRY.remove(trigger)
                 self._send(200, {'success': True})
             except:
                 self._send(400, {'error': 'Failed to delete'})
+        elif self.path == '/sessions':
+            try:
+                name = json.loads(self._read_body()).get('name')
+                found = self._queue_task(lambda: SESSIONS.drop(name))
+                self._send(200 if found else 404, {'success': bool(found)})
+            except:
+                self._send(400, {'error': 'Failed to delete'})
+        elif self.path == '/checkpoint':
+            try:
+                name = json.loads(self._read_body()).get('name')
+            except:
+                self._send(400, {'error': 'Failed to delete'})
+                return
+            result = self._queue_task(lambda: BridgeCore.checkpoint(CHECKPOINTS.delete, name))
+            if result is None:
+                self._send(504, {'error': 'Timed out waiting for Blender'})
+            else:
+                self._send(result.pop('status', 200), result)
+
+# ==============================================================================
+# INSTANCE DISCOVERY
+# ==============================================================================
+
+def _pid_alive(pid):
+    if pid == os.getpid():
+        return True
+    if sys.platform == 'win32':
+        import ctypes
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        handle = ctypes.windll.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == STILL_ACTIVE
+        finally:
+            ctypes.windll.kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+class InstanceRegistry:
+    """Discovery records for every bridge running on this machine.
+
+    Each bridge owns one small JSON file in DATA_DIR/instances, so instances
+    never contend for a shared file; listing reads them all and removes the
+    records of processes that are gone.
+    """
+
+    def __init__(self, dirname):
+        self.dirname = dirname
+        self._record_path = None
+
+    @property
+    def directory(self):
+        return data_path(self.dirname)
+
+    def _current_record(self):
+        return {
+            "port": PORT,
+            "token": SERVER_TOKEN,
+            "pid": os.getpid(),
+            "blend_file": bpy.data.filepath or None,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(METRICS.started)),
+            "blender_version": getattr(bpy.app, "version_string", None),
+            "background": bool(bpy.app.background),
+            "url": f"http://127.0.0.1:{PORT}",
+        }
+
+    def publish(self):
+        """Writes (or refreshes) this process's record."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{os.getpid()}-{PORT}.json")
+            if self._record_path and self._record_path != path:
+                self.withdraw()
+            tmp = path + ".tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._current_record(), f, indent=2)
+            if sys.platform != 'win32':
+                os.chmod(tmp, 0o600) # The record holds the auth token
+            os.replace(tmp, path)
+            self._record_path = path
+        except Exception as e:
+            print(f"[Gemini] Could not publish instance record: {e}")
+
+    def withdraw(self):
+        if self._record_path:
+            try:
+                os.remove(self._record_path)
+            except OSError:
+                pass
+            self._record_path = None
+
+    def list(self):
+        """Returns the records of live instances, pruning stale ones."""
+        records = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return records
+        for name in sorted(names):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    record = json.load(f)
+                alive = _pid_alive(int(record.get("pid", 0)))
+            except Exception:
+                alive = False
+            if not alive:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            record["self"] = record.get("pid") == os.getpid() and record.get("port") == PORT
+            records.append(record)
+        return records
+
+
+INSTANCES = InstanceRegistry(INSTANCES_DIR_NAME)
+
+
+# ==============================================================================
+# SCENE CHECKPOINTS
+# ==============================================================================
+
+class UnsavedChanges(Exception):
+    """Raised when a restore would discard unsaved changes and wasn't forced."""
+
+
+class CheckpointStore:
+    """Named .blend snapshots in DATA_DIR/checkpoints for try/rollback loops.
+
+    Saving writes a copy of the current file (the open file and its path are
+    untouched); restoring opens that copy, which then becomes the open file.
+    Checkpoints are kept in LRU order and the least recently used ones are
+    deleted beyond the disk budget or max_count, except the one that is open.
+    File mtimes record use, so the order survives restarts.
+
+    Several Blender instances share DATA_DIR, so each open .blend gets its own
+    subdirectory (unsaved files get one per process) and only that one is
+    listed, restored from and evicted.
+    """
+
+    def __init__(self, dirname, budget_bytes, max_count):
+        self.dirname = dirname
+        self.budget_bytes = budget_bytes
+        self.max_count = max_count
+        self._entries = None # name -> info, least recently used first
+        self._entries_dir = None
+
+    @property
+    def root(self):
+        return data_path(self.dirname)
+
+    @property
+    def directory(self):
+        return os.path.join(self.root, self.namespace())
+
+    def namespace(self):
+        """Subdirectory for the open file: a restored checkpoint stays in the one it came from."""
+        filepath = bpy.data.filepath
+        if not filepath:
+            return f"pid-{os.getpid()}"
+        parent = os.path.dirname(os.path.abspath(filepath))
+        if os.path.normcase(os.path.dirname(parent)) == os.path.normcase(os.path.abspath(self.root)):
+            return os.path.basename(parent)
+        return hashlib.sha1(os.path.normcase(os.path.abspath(filepath)).encode("utf-8")).hexdigest()[:16]
+
+    def _prune_orphans(self):
+        """Removes the checkpoints of unsaved files whose Blender process is gone."""
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return
+        for name in names:
+            pid = name[len("pid-"):]
+            if name.startswith("pid-") and pid.isdigit() and not _pid_alive(int(pid)):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+    @staticmethod
+    def clean_name(name):
+        name = "".join(c if c.isalnum() or c in "-_." else "_" for c in str(name or "")).strip("._")[:64]
+        if not name:
+            raise ValueError("Invalid checkpoint name")
+        return name
+
+    def open_name(self):
+        """Name of the checkpoint that is the open file in Blender, or None."""
+        filepath = bpy.data.filepath
+        if not filepath or not filepath.endswith(".blend"):
+            return None
+        if os.path.normcase(os.path.dirname(os.path.abspath(filepath))) != os.path.normcase(os.path.abspath(self.directory)):
+            return None
+        return os.path.basename(filepath)[:-len(".blend")]
+
+    def _load(self):
+        directory = self.directory
+        if self._entries is None or self._entries_dir != directory:
+            if self._entries is None:
+                self._prune_orphans()
+            self._entries = collections.OrderedDict()
+            self._entries_dir = directory
+            try:
+                files = [f for f in os.listdir(directory) if f.endswith(".blend")]
+            except OSError:
+                files = []
+            infos = []
+            for filename in files:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                infos.append((stat.st_mtime, filename[:-len(".blend")], path, stat.st_size))
+            for mtime, name, path, size in sorted(infos):
+                self._entries[name] = {"path": path, "size_bytes": size, "last_used": mtime}
+        return self._entries
+
+    def save(self, name=None):
+        entries = self._load()
+        if name:
+            name = self.clean_name(name)
+        else:
+            name = base = time.strftime("checkpoint-%Y%m%d-%H%M%S")
+            suffix = 1
+            while name in entries: # Several automatic saves within one second
+                suffix += 1
+                name = f"{base}-{suffix}"
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name + ".blend")
+        start = time.perf_counter()
+        bpy.ops.wm.save_as_mainfile(filepath=path, copy=True, check_existing=False)
+        elapsed = time.perf_counter() - start
+        if not os.path.exists(path):
+            raise RuntimeError(f"Blender did not write {path}")
+        entries.pop(name, None)
+        entries[name] = {"path": path, "size_bytes": os.path.getsize(path), "last_used": time.time()}
+        evicted = self._enforce(keep=name)
+        METRICS.observe("gemini_checkpoint_seconds", elapsed, op="save")
+        return {"name": name, "path": path, "size_bytes": entries[name]["size_bytes"],
+                "elapsed": round(elapsed, 4), "evicted": evicted}
+
+    def restore(self, name=None, force=False):
+        entries = self._load()
+        if not name:
+            if not entries:
+                raise KeyError("No checkpoints")
+            name = next(reversed(entries)) # Most recently saved or restored
+        name = self.clean_name(name)
+        entry = entries.get(name)
+        if entry is None or not os.path.exists(entry["path"]):
+            entries.pop(name, None)
+            raise KeyError(f"Checkpoint '{name}' not found")
+        if bpy.data.is_dirty and not force:
+            raise UnsavedChanges(f"Blender has unsaved changes that restoring '{name}' would discard; "
+                                 "save the file first or pass force")
+        previous = bpy.data.filepath
+        start = time.perf_counter()
+        bpy.ops.wm.open_mainfile(filepath=entry["path"], load_ui=False)
+        elapsed = time.perf_counter() - start
+        entries.move_to_end(name)
+        entry["last_used"] = time.time()
+        SCENE_CHANGES.touch()
+        try:
+            os.utime(entry["path"])
+        except OSError:
+            pass
+        METRICS.observe("gemini_checkpoint_seconds", elapsed, op="restore")
+        warning = (f"The open file is now the checkpoint copy {entry['path']}. "
+                   f"Use File > Save As{f' (e.g. back to {previous})' if previous else ''} to keep this state; "
+                   "File > Save writes into the checkpoint.")
+        print(f"[Gemini] Restored checkpoint '{name}'. {warning}")
+        return {"name": name, "elapsed": round(elapsed, 4), "previous_filepath": previous or None,
+                "filepath": entry["path"], "warning": warning}
+
+    def delete(self, name):
+        name = self.clean_name(name)
+        if name not in self._load():
+            raise KeyError(f"Checkpoint '{name}' not found")
+        if name == self.open_name():
+            raise PermissionError(f"Checkpoint '{name}' is the open file; save it elsewhere first")
+        self._remove(name)
+        return {"success": True, "name": name}
+
+    def _remove(self, name):
+        entry = self._entries.pop(name)
+        try:
+            os.remove(entry["path"])
+        except OSError:
+            pass
+
+    def _enforce(self, keep=None):
+        """Deletes least recently used checkpoints beyond the budget; returns their names."""
+        entries = self._entries
+        evicted = []
+        total = sum(e["size_bytes"] for e in entries.values())
+        protected = {keep, self.open_name()} # Never delete the file Blender has open
+        while entries and (total > self.budget_bytes or len(entries) > self.max_count):
+            name = next((n for n in entries if n not in protected), None)
+            if name is None:
+                break # Only protected checkpoints are left; keep them even beyond the budget
+            total -= entries[name]["size_bytes"]
+            self._remove(name)
+            evicted.append(name)
+        return evicted
+
+    def describe(self):
+        entries = self._load()
+        return {
+            "checkpoints": [{"name": name, "size_bytes": e["size_bytes"],
+                             "last_used": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(e["last_used"]))}
+                            for name, e in reversed(entries.items())],
+            "total_bytes": sum(e["size_bytes"] for e in entries.values()),
+            "directory": self.directory,
+            "budget_bytes": self.budget_bytes,
+            "max_count": self.max_count,
+        }
+
+
+CHECKPOINTS = CheckpointStore(CHECKPOINTS_DIR_NAME, DEFAULT_CHECKPOINT_BUDGET_MB * 1024 * 1024, MAX_CHECKPOINTS)
+
+
+# ==============================================================================
+# PROMPT CONTEXT
+# ==============================================================================
+
+class SceneChangeLog:
+    """Recent depsgraph updates, with repeated updates of one ID coalesced."""
+
+    def __init__(self, maxlen):
+        self.entries = collections.deque(maxlen=maxlen)
+        self.version = 0
+        self.last_change = {} # ID name -> version of its latest update
+        self.edits = 0 # Bridge operations that may have changed the scene
+
+    def touch(self):
+        # Headless Blender may not evaluate the depsgraph after a script, so
+        # bridge writes invalidate cached context on their own.
+        self.edits += 1
+
+    def record(self, kind, name, what):
+        self.version += 1
+        self.last_change[name] = self.version
+        last = self.entries[-1] if self.entries else None
+        if last and last["kind"] == kind and last["name"] == name:
+            last["count"] += 1
+            last["time"] = time.time()
+            last["what"] = sorted(set(last["what"]) | set(what))
+        else:
+            self.entries.append({"kind": kind, "name": name, "what": what, "count": 1, "time": time.time()})
+
+
+SCENE_CHANGES = SceneChangeLog(SCENE_CHANGE_HISTORY)
+
+
+@bpy.app.handlers.persistent
+def _record_scene_changes(scene, depsgraph=None):
+    try:
+        for update in depsgraph.updates:
+            what = [flag for flag, attr in (("transform", "is_updated_transform"),
+                                            ("geometry", "is_updated_geometry"),
+                                            ("shading", "is_updated_shading")) if getattr(update, attr, False)]
+            SCENE_CHANGES.record(type(update.id).__name__, update.id.name, what)
+    except Exception:
+        pass # Never break Blender's update loop
+
+
+class ContextBuilder:
+    """Builds compact prompt context in priority order within a size budget.
+
+    Each section is rendered to lines and cached under a fingerprint of the
+    state it depends on, so unchanged sections cost a dictionary lookup.
+    Sections that don't fit are cut line by line with a "more" marker.
+    """
+
+    def __init__(self):
+        self._cache = {} # section -> (fingerprint, lines)
+        self._memory = (None, []) # (mtime, size), lines
+
+    @staticmethod
+    def _fmt(value):
+        if isinstance(value, float):
+            return f"{value:.3g}"
+        if isinstance(value, (list, tuple)):
+            return "(" + ",".join(ContextBuilder._fmt(v) for v in value) + ")"
+        return str(value)
+
+    # --- sections: each returns (fingerprint, build function) ---
+
+    def _active_object(self, obj, query):
+        if obj is None:
+            return None, lambda: ["Active object: none"]
+        def build():
+            lines = [f"Active object: {obj.name} ({obj.type})"]
+            try:
+                lines.append("Transform: loc " + self._fmt([round(v, 3) for v in obj.location]) +
+                             " rot " + self._fmt([round(v, 3) for v in obj.rotation_euler]) +
+                             " scale " + self._fmt([round(v, 3) for v in obj.scale]))
+            except Exception:
+                pass
+            mods = [f"{m.name} [{m.type}]" for m in obj.modifiers]
+            lines.append("Modifiers: " + (", ".join(mods) if mods else "none"))
+            return lines
+        return (obj.name, SCENE_CHANGES.last_change.get(obj.name), SCENE_CHANGES.edits), build
+
+    def _graph(self, obj, query):
+        tree = BridgeCore.find_node_tree() if obj is not None else None
+        if tree is None:
+            return None, lambda: []
+        def build():
+            incoming = collections.defaultdict(list)
+            for link in tree.links:
+                try:
+                    incoming[link.to_node.name].append(
+                        f"{link.to_socket.identifier}<-{link.from_node.name}:{link.from_socket.identifier}")
+                except Exception:
+                    continue
+            types = collections.Counter(node.bl_idname for node in tree.nodes)
+            lines = [f"Node tree {tree.name}: {len(tree.nodes)} nodes, {len(tree.links)} links",
+                     "Types: " + ", ".join(f"{t} x{n}" for t, n in types.most_common())]
+            for node in tree.nodes:
+                parts = list(incoming.get(node.name, ()))
+                for sock in node.inputs:
+                    value = GraphSerializer.get_socket_value(sock)
+                    if value is not None:
+                        parts.append(f"{sock.identifier}={self._fmt(value)}")
+                lines.append(f"- {node.name} [{node.bl_idname}] " + " ".join(parts))
+            return lines
+        return (tree.name, len(tree.nodes), len(tree.links), SCENE_CHANGES.last_change.get(tree.name),
+                SCENE_CHANGES.edits), build
+
+    def _changes(self, obj, query):
+        def build():
+            now = time.time()
+            lines = []
+            for entry in reversed(SCENE_CHANGES.entries): # Newest first
+                what = ", ".join(entry["what"]) or "updated"
+                repeat = f" (x{entry['count']})" if entry["count"] > 1 else ""
+                lines.append(f"- {int(now - entry['time'])}s ago {entry['kind']} {entry['name']}: {what}{repeat}")
+            return lines
+        # Ages are relative, so refresh at most every few seconds.
+        return (SCENE_CHANGES.version, int(time.time() // 5)), build
+
+    def _memory_lines(self):
+        path = data_path(MEMORY_FILE_NAME)
+        try:
+            stat = os.stat(path)
+            key = (stat.st_mtime, stat.st_size)
+        except OSError:
+            return []
+        if self._memory[0] != key:
+            text = BridgeCore.read_file(path, "")
+            seen, lines = set(), []
+            for line in reversed(text.splitlines()): # Keep the newest copy of duplicates
+                norm = " ".join(line.split()).lower()
+                if norm and norm not in seen:
+                    seen.add(norm)
+                    lines.append(line.strip())
+            self._memory = (key, lines) # Newest first
+        return self._memory[1]
+
+    def _memory_section(self, obj, query):
+        lines = self._memory_lines()
+        def build():
+            words = {w for w in "".join(c.lower() if c.isalnum() else " " for c in query or "").split() if len(w) > 2}
+            if not words:
+                return ["- " + line for line in lines]
+            scored = []
+            for rank, line in enumerate(lines):
+                tokens = set("".join(c.lower() if c.isalnum() else " " for c in line).split())
+                score = len(words & tokens)
+                if score:
+                    scored.append((-score, rank, line))
+            return ["- " + line for _, _, line in sorted(scored)]
+        return (self._memory[0], query), build
+
+    SECTION_TITLES = {"active_object": "Scene", "graph": "Graph", "changes": "Recent changes", "memory": "Memory"}
+
+    @staticmethod
+    def _fit(header, lines, limit):
+        """Returns how many lines (plus header and "more" marker) fit in limit chars."""
+        used = len(header) + 1
+        for n, line in enumerate(lines):
+            marker = len(f"... ({len(lines) - n} more)") + 1
+            if used + len(line) + 1 + (marker if n + 1 < len(lines) else 0) > limit:
+                return n if used + marker <= limit else 0
+            used += len(line) + 1
+        return len(lines)
+
+    def build(self, sections=None, max_chars=None, max_tokens=None, query=""):
+        start = time.perf_counter()
+        if max_chars is None:
+            max_chars = int(max_tokens or CONTEXT_DEFAULT_TOKENS) * CHARS_PER_TOKEN
+        sections = [s for s in CONTEXT_SECTIONS if s in (sections or CONTEXT_SECTIONS)]
+        obj = bpy.context.active_object
+        builders = {"active_object": self._active_object, "graph": self._graph,
+                    "changes": self._changes, "memory": self._memory_section}
+
+        rendered = {} # name -> (header, lines, cached)
+        for name in sections:
+            fingerprint, build = builders[name](obj, query)
+            cached = self._cache.get(name)
+            hit = fingerprint is not None and cached is not None and cached[0] == fingerprint
+            lines = cached[1] if hit else build()
+            if fingerprint is not None and not hit:
+                self._cache[name] = (fingerprint, lines)
+            if lines:
+                rendered[name] = (f"## {self.SECTION_TITLES[name]}", lines, hit)
+
+        def cost(name, n):
+            header, lines, _ = rendered[name]
+            if not n:
+                return 0
+            used = len(header) + 1 + sum(len(l) + 1 for l in lines[:n]) + 2 # + section separator
+            return used + (len(f"... ({len(lines) - n} more)") + 1 if n < len(lines) else 0)
+
+        # Pass 1: each section up to its share; pass 2: leftovers by priority.
+        counts, remaining = {}, max_chars
+        for name in rendered:
+            header, lines, _ = rendered[name]
+            counts[name] = self._fit(header, lines, min(remaining, int(CONTEXT_SHARES[name] * max_chars)) - 2)
+            remaining -= cost(name, counts[name])
+        for name in rendered:
+            header, lines, _ = rendered[name]
+            if counts[name] < len(lines) and remaining > 0:
+                before = cost(name, counts[name])
+                counts[name] = self._fit(header, lines, before + remaining - 2)
+                remaining -= cost(name, counts[name]) - before
+
+        out, report = [], {}
+        for name in sections:
+            if name not in rendered:
+                report[name] = {"chars": 0, "lines": 0, "truncated": False, "cached": name in self._cache}
+                continue
+            header, lines, hit = rendered[name]
+            n = counts[name]
+            if n:
+                body = lines[:n] + ([f"... ({len(lines) - n} more)"] if n < len(lines) else [])
+                out.append("\n".join([header] + body))
+            report[name] = {"chars": len(out[-1]) if n else 0, "lines": n, "truncated": n < len(lines), "cached": hit}
+
+        text = "\n\n".join(out)
+        return {
+            "context": text,
+            "chars": len(text),
+            "tokens_estimate": (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN,
+            "budget_chars": max_chars,
+            "sections": report,
+            "elapsed": round(time.perf_counter() - start, 4),
+        }
+
+
+CONTEXT = ContextBuilder()
+
+
+@bpy.app.handlers.persistent
+def _refresh_instance_record(*args):
+    # Keeps blend_file current after File > Open / Save As.
+    if HTTPD:
+        INSTANCES.publish()
+
 
 # ==============================================================================
 # ADDON REGISTRATION & UI
@@ -482,6 +2773,46 @@ class GeminiPreferences(bpy.types.AddonPreferences):
         min=0,
         max=32768
     )
+    start_mode: bpy.props.EnumProperty(
+        name="Start Server",
+        items=[
+            ('DEFERRED', "After Startup", "Start shortly after Blender has finished loading (Default)"),
+            ('ON_DEMAND', "On Demand", "Start when the Gemini panel is first shown or the interface is launched"),
+            ('IMMEDIATE', "Immediately", "Start while the addon is registered (slows Blender startup)"),
+        ],
+        default=DEFAULT_START_MODE
+    )
+    port_range_start: bpy.props.IntProperty(
+        name="First Port",
+        description="The server binds the first free port in this range, so several Blender instances can run side by side",
+        default=DEFAULT_PORT_RANGE[0],
+        min=1024,
+        max=65535
+    )
+    port_range_end: bpy.props.IntProperty(
+        name="Last Port",
+        default=DEFAULT_PORT_RANGE[1],
+        min=1024,
+        max=65535
+    )
+    preload_modules: bpy.props.StringProperty(
+        name="Preloaded Modules",
+        description="Comma-separated modules imported at server start and available to every script",
+        default=DEFAULT_PRELOAD_MODULES
+    )
+    redraw_interval: bpy.props.FloatProperty(
+        name="Redraw Interval",
+        description="Minimum seconds between viewport redraws after scripts run (0 = at most once per queue tick). Applied at server start",
+        default=DEFAULT_REDRAW_INTERVAL,
+        min=0.0,
+        max=5.0
+    )
+    checkpoint_budget_mb: bpy.props.IntProperty(
+        name="Checkpoint Disk Budget (MB)",
+        description="Least recently used scene checkpoints are deleted beyond this size. Applied at server start",
+        default=DEFAULT_CHECKPOINT_BUDGET_MB,
+        min=16
+    )
     verbosity: bpy.props.EnumProperty(
         name="Verbosity",
         items=[
@@ -500,6 +2831,13 @@ class GeminiPreferences(bpy.types.AddonPreferences):
         if "gemini-3" in self.model or "thinking" in self.model:
             layout.prop(self, "thinking_budget")
         layout.prop(self, "verbosity")
+        layout.prop(self, "start_mode")
+        row = layout.row(align=True)
+        row.prop(self, "port_range_start")
+        row.prop(self, "port_range_end")
+        layout.prop(self, "preload_modules")
+        layout.prop(self, "redraw_interval")
+        layout.prop(self, "checkpoint_budget_mb")
 
 
 def get_prefs(context):
@@ -514,6 +2852,7 @@ class GEMINI_OT_LaunchAssistant(bpy.types.Operator):
 
     def execute(self, context):
         prefs = get_prefs(context)
+        ensure_server()
         # POINT TO LOCALHOST REACT APP (Port 3000 as per vite.config.ts)
         base_url = "http://localhost:3000/" 
 
@@ -563,7 +2902,17 @@ class GEMINI_PT_panel(bpy.types.Panel):
             row = status_box.row()
             row.label(text="Status: Offline", icon='CHECKBOX_DEHLT')
             row.operator("gemini.control_server", text="Start", icon='PLAY').action = 'START'
+            if prefs and prefs.start_mode == 'ON_DEMAND' and _AUTO_START_ALLOWED:
+                schedule_server_start(0.0)
         
+        checkpoint = CHECKPOINTS.open_name() if bpy.data.filepath else None
+        if checkpoint:
+            # Restored checkpoint: Ctrl+S would write into a file the LRU may delete later.
+            row = status_box.row()
+            row.alert = True
+            row.label(text=f"Open file is checkpoint '{checkpoint}': use Save As", icon='ERROR')
+            status_box.label(text=bpy.data.filepath)
+
         if SERVER_STATUS_MESSAGE:
              row = status_box.row()
              if "Error" in SERVER_STATUS_MESSAGE:
@@ -582,35 +2931,126 @@ class GEMINI_PT_panel(bpy.types.Panel):
             layout.prop(prefs, "verbosity", text="Verbosity")
         layout.separator()
         layout.label(text="Data Storage: User Scripts > Presets")
+        if STARTUP_TIMINGS:
+            layout.label(text="Startup: " + ", ".join(f"{k} {v:.1f} ms" for k, v in STARTUP_TIMINGS.items()), icon='TIME')
 
 
 SERVER_THREAD = None
 HTTPD = None
 SERVER_STATUS_MESSAGE = ""
+_AUTO_START_ALLOWED = True # Cleared when the user stops the server by hand or an automatic start fails
+_BACKGROUND_STOP = threading.Event()
 
 
 class ReusableTCPServer(socketserver.ThreadingTCPServer):
-    allow_reuse_address = True
+    # On Windows SO_REUSEADDR lets a second process bind a port that is already
+    # in use, which would defeat the free-port search.
+    allow_reuse_address = sys.platform != 'win32'
 
 
-def process_queue():
+def _drain_queue(task=None):
+    """Runs task (if given) and everything else queued, on the calling (main) thread."""
+    start = time.perf_counter()
+    ran = task is not None
     try:
+        if task is not None:
+            task()
         while not EXECUTION_QUEUE.empty():
             task = EXECUTION_QUEUE.get_nowait()
+            ran = True
             task()
     except Exception as e:
         print(f"Queue Error: {e}")
+    REDRAW.flush()
+    SESSIONS.evict_idle()
+    if ran:
+        METRICS.observe("gemini_timer_tick_seconds", time.perf_counter() - start)
+
+
+def process_queue():
+    _drain_queue()
     return 0.05
 
 
-def start_server():
-    global HTTPD, SERVER_THREAD, SERVER_STATUS_MESSAGE
+def stop_background():
+    """Asks run_background() to return; for other threads, not signal handlers.
+
+    queue.Queue is not reentrant: a put() from a handler that interrupted the
+    main thread inside get() would deadlock. Handlers only set the flag.
+    """
+    _BACKGROUND_STOP.set()
+    EXECUTION_QUEUE.put(lambda: None) # Wake the blocking get()
+
+
+def run_background(poll_interval=BACKGROUND_POLL_INTERVAL):
+    """Main-thread loop for `blender -b`, where bpy.app.timers never fire.
+
+    Blocks on the execution queue so requests run as soon as they arrive,
+    prints a one-line JSON ready record for orchestrators, and returns after
+    SIGINT/SIGTERM (within poll_interval) or stop_background().
+    """
+    ensure_server()
+    if not HTTPD:
+        print(f"[Gemini] Background mode: server not running ({SERVER_STATUS_MESSAGE})")
+        return
+    _BACKGROUND_STOP.clear()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            # Picked up by the loop within poll_interval.
+            signal.signal(sig, lambda signum, frame: _BACKGROUND_STOP.set())
+        except ValueError:
+            pass # Not the main thread; rely on stop_background()
+    ready = {"port": PORT, "token": SERVER_TOKEN, "pid": os.getpid(), "version": ".".join(map(str, bl_info["version"]))}
+    print(f"{READY_PREFIX} {json.dumps(ready)}", flush=True)
+
+    while not _BACKGROUND_STOP.is_set():
+        try:
+            task = EXECUTION_QUEUE.get(timeout=poll_interval)
+        except queue.Empty:
+            task = None
+        _drain_queue(task)
+
+    print("[Gemini] Background mode: shutting down", flush=True)
+    stop_server()
+    TOOL_REGISTRY.flush()
+
+
+def start_server(port_range=None):
+    """Starts the HTTP server on the first free port of port_range.
+
+    port_range defaults to $GEMINI_BRIDGE_PORTS, then the addon preferences;
+    (0, 0) lets the OS pick.
+    """
+    global HTTPD, SERVER_THREAD, SERVER_STATUS_MESSAGE, PORT
     if HTTPD:
         print("[Gemini] Server already running.")
         SERVER_STATUS_MESSAGE = f"Online: Port {PORT}"
         return
+    start = time.perf_counter()
+    prefs = get_prefs(bpy.context)
+    preload_modules(prefs.preload_modules if prefs else DEFAULT_PRELOAD_MODULES)
+    REDRAW.min_interval = prefs.redraw_interval if prefs else DEFAULT_REDRAW_INTERVAL
+    CHECKPOINTS.budget_bytes = (prefs.checkpoint_budget_mb if prefs else DEFAULT_CHECKPOINT_BUDGET_MB) * 1024 * 1024
+    if port_range is None and os.environ.get(PORT_RANGE_ENV):
+        try:
+            port_range = tuple(int(p) for p in os.environ[PORT_RANGE_ENV].split("-"))
+        except ValueError:
+            print(f"[Gemini] Ignoring invalid {PORT_RANGE_ENV}={os.environ[PORT_RANGE_ENV]!r}")
+    if port_range is None:
+        port_range = (prefs.port_range_start, prefs.port_range_end) if prefs else DEFAULT_PORT_RANGE
+    first, last = port_range[0], max(port_range)
     try:
-        HTTPD = ReusableTCPServer(('127.0.0.1', PORT), RequestHandler)
+        for port in range(first, last + 1):
+            try:
+                HTTPD = ReusableTCPServer(('127.0.0.1', port), RequestHandler)
+                break
+            except OSError:
+                continue
+        if not HTTPD:
+            print(f"[Gemini] No free port in {first}-{last}. Please stop other instances.")
+            SERVER_STATUS_MESSAGE = f"Error: Ports {first}-{last} busy."
+            return
+        PORT = HTTPD.server_address[1]
         HTTPD.daemon_threads = True
         SERVER_THREAD = threading.Thread(target=HTTPD.serve_forever)
         SERVER_THREAD.daemon = True
@@ -620,15 +3060,20 @@ def start_server():
         SERVER_STATUS_MESSAGE = f"Online: Port {PORT}"
 
         if not bpy.app.timers.is_registered(process_queue):
-            bpy.app.timers.register(process_queue)
+            # persistent: keep pumping across File > Open and /restore.
+            bpy.app.timers.register(process_queue, persistent=True)
+        INSTANCES.publish()
+        for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.save_post):
+            if _refresh_instance_record not in handlers:
+                handlers.append(_refresh_instance_record)
+        if _record_scene_changes not in bpy.app.handlers.depsgraph_update_post:
+            bpy.app.handlers.depsgraph_update_post.append(_record_scene_changes)
+        STARTUP_TIMINGS['server'] = (time.perf_counter() - start) * 1000
 
-    except OSError as e:
-        print(f"[Gemini] Port {PORT} in use. Please stop other instances.")
-        SERVER_STATUS_MESSAGE = f"Error: Port {PORT} busy. Restart Blender."
-        HTTPD = None
     except Exception as e:
         print(f"[Gemini] Failed to start server: {e}")
         SERVER_STATUS_MESSAGE = f"Error: {str(e)}"
+        HTTPD = None
 
 
 def stop_server():
@@ -641,11 +3086,43 @@ def stop_server():
             pass
         HTTPD = None
         SERVER_THREAD = None
+        INSTANCES.withdraw()
         print("[Gemini] Server stopped")
         SERVER_STATUS_MESSAGE = "Server Stopped"
 
     if bpy.app.timers.is_registered(process_queue):
         bpy.app.timers.unregister(process_queue)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.save_post):
+        if _refresh_instance_record in handlers:
+            handlers.remove(_refresh_instance_record)
+    if _record_scene_changes in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_record_scene_changes)
+
+
+def ensure_server():
+    """Starts the server unless it is running, was stopped by the user or already failed to start.
+
+    Automatic starts are tried once per session; after a failure (e.g. every
+    port busy) only the panel's Start button tries again.
+    """
+    global _AUTO_START_ALLOWED
+    if not HTTPD and _AUTO_START_ALLOWED:
+        start_server()
+        if not HTTPD:
+            _AUTO_START_ALLOWED = False
+
+
+def _deferred_start():
+    ensure_server()
+    return None # One-shot timer
+
+
+def schedule_server_start(delay=DEFERRED_START_DELAY):
+    """Starts the server from a timer, outside of register() or draw()."""
+    if not bpy.app.timers.is_registered(_deferred_start):
+        # Persistent: a .blend given on the command line loads after register()
+        # and would otherwise drop the timer before it fires.
+        bpy.app.timers.register(_deferred_start, first_interval=delay, persistent=True)
 
 
 class GEMINI_OT_control_server(bpy.types.Operator):
@@ -654,9 +3131,12 @@ class GEMINI_OT_control_server(bpy.types.Operator):
     action: bpy.props.StringProperty()
 
     def execute(self, context):
+        global _AUTO_START_ALLOWED
         if self.action == 'START':
             start_server()
+            _AUTO_START_ALLOWED = HTTPD is not None # A failed manual start doesn't re-arm panel auto-start
         elif self.action == 'STOP':
+            _AUTO_START_ALLOWED = False
             stop_server()
         return {'FINISHED'}
 
@@ -665,16 +3145,32 @@ classes = (GeminiPreferences, GEMINI_OT_LaunchAssistant, GEMINI_OT_control_serve
 
 
 def register():
-    start_server()
+    start = time.perf_counter()
+    STARTUP_TIMINGS.pop('server', None)
     for cls in classes:
         bpy.utils.register_class(cls)
+    prefs = get_prefs(bpy.context)
+    start_mode = prefs.start_mode if prefs else DEFAULT_START_MODE
+    if bpy.app.background or start_mode == 'IMMEDIATE':
+        # Timers never fire in background mode, so start right away there.
+        start_server()
+    elif start_mode == 'DEFERRED':
+        schedule_server_start()
+    STARTUP_TIMINGS['register'] = (time.perf_counter() - start) * 1000 - STARTUP_TIMINGS.get('server', 0)
+    print("[Gemini] Startup: " + ", ".join(f"{k} {v:.1f} ms" for k, v in STARTUP_TIMINGS.items()))
 
 
 def unregister():
+    if bpy.app.timers.is_registered(_deferred_start):
+        bpy.app.timers.unregister(_deferred_start)
     stop_server()
+    TOOL_REGISTRY.flush()
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
 
 
+STARTUP_TIMINGS['import'] = (time.perf_counter() - _IMPORT_START) * 1000
+
+
 if __name__ == "__main__":
     register()
\ No newline at end of file
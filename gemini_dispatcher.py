@@ -0,0 +1,462 @@
+"""
+Gemini Dispatcher: a pool of headless Blender workers behind one /execute API.
+
+Launches N `blender -b` processes running the bridge, then serves the same
+execution endpoints as a single bridge and forwards each job to the least
+busy worker. Jobs may carry an `affinity` key (or a `blend_file`) to stick to
+one worker; with `blend_file`, the worker opens that file before running the
+job. Crashed workers are restarted automatically.
+
+Runs in plain Python (no bpy needed):
+    python gemini_dispatcher.py --blender /path/to/blender --workers 8
+
+Clients talk to the dispatcher exactly like to a bridge, using the token it
+prints on startup:
+    POST /execute, /execute/batch, /tools/run   forwarded to a worker
+    GET  /execute/output?id=...                  forwarded to the worker that issued the id
+    GET  /workers                                pool status
+
+Execution ids are prefixed with the worker index ("3-<id>") so polls can be
+routed; `stream` responses are relayed line by line.
+"""
+import os
+import sys
+import json
+import time
+import signal
+import secrets
+import argparse
+import contextlib
+import threading
+import subprocess
+import http.client
+import http.server
+import urllib.parse
+
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+WORKER_SCRIPT = os.path.join(PROJECT_ROOT, "tests", "e2e_bridge_wrapper.py")
+
+DEFAULT_PORT = 8100
+FORWARD_PATHS = ('/execute', '/execute/batch', '/tools/run')
+FORWARD_TIMEOUT = 600 # Seconds a forwarded job may take
+OPEN_FILE_TIMEOUT = 600 # Seconds a worker may take to open a .blend for a job
+WORKER_START_TIMEOUT = 60 # Seconds for a worker to report its port and token
+RESTART_BACKOFF = (1, 2, 5, 10, 30) # Seconds between successive restarts of a worker
+READY_PREFIX = "[Gemini] Ready:" # Printed by gemini_bridge.run_background()
+
+
+class WorkerBusy(Exception):
+    """The worker has another blend_file open for jobs that are still running."""
+
+
+class Worker:
+    """One headless Blender process running the bridge."""
+
+    def __init__(self, index, blender, blend_file=None, extra_args=()):
+        self.index = index
+        self.blender = blender
+        self.initial_blend = blend_file
+        self.extra_args = list(extra_args)
+        self.process = None
+        self.port = None
+        self.token = None
+        self.blend_file = None
+        self.ready = threading.Event()
+        self.in_flight = 0
+        self.completed = 0
+        self.failures = 0
+        self.restarts = 0
+        self.restart_at = None # Time of the next restart attempt after a crash
+        self.file_lock = threading.Condition() # Guards blend_file switches against running jobs
+        self.file_users = 0 # Forwarded jobs that rely on the open blend_file
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def start(self):
+        self.ready.clear()
+        self.port = self.token = None
+        cmd = [self.blender, "-b", "--factory-startup"]
+        if self.initial_blend:
+            cmd.append(self.initial_blend)
+        cmd += self.extra_args + ["--python", WORKER_SCRIPT]
+        env = dict(os.environ)
+        env.setdefault("GEMINI_BRIDGE_PORTS", "0") # Any free port; the pool may exceed the default range
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                        text=True, bufsize=1, cwd=PROJECT_ROOT, env=env)
+        self.blend_file = self.initial_blend
+        threading.Thread(target=self._read_output, args=(self.process,), daemon=True).start()
+        print(f"[Dispatcher] Worker {self.index}: launched pid {self.process.pid}")
+
+    def _read_output(self, process):
+        for line in process.stdout:
+            line = line.strip()
+            if line.startswith(READY_PREFIX) and not self.ready.is_set():
+                record = json.loads(line[len(READY_PREFIX):])
+                self.port, self.token = record["port"], record["token"]
+                self.ready.set()
+                print(f"[Dispatcher] Worker {self.index}: ready on port {self.port}")
+
+    def stop(self):
+        if self.alive:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    def open(self, method, path, body=None, timeout=FORWARD_TIMEOUT):
+        """Sends a request to the worker's bridge; returns (connection, response) to read from.
+
+        Connects before sending, so a ConnectionRefusedError always means nothing was delivered.
+        """
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=timeout)
+        try:
+            conn.connect()
+            headers = {"X-Blender-Token": self.token, "Content-Type": "application/json"}
+            conn.request(method, path, body=body, headers=headers)
+            return conn, conn.getresponse()
+        except:
+            conn.close()
+            raise
+
+    def request(self, method, path, body=None, timeout=FORWARD_TIMEOUT):
+        """Sends a request to the worker's bridge; returns (status, body bytes)."""
+        conn, resp = self.open(method, path, body, timeout)
+        try:
+            return resp.status, resp.read()
+        finally:
+            conn.close()
+
+    def open_file(self, blend_file):
+        code = f"import bpy\nbpy.ops.wm.open_mainfile(filepath={blend_file!r}, load_ui=False)"
+        # The bridge's queue wait follows the script timeout; its 15s default is too short for big files.
+        payload = {"code": code, "timeout": OPEN_FILE_TIMEOUT}
+        status, body = self.request("POST", "/execute", json.dumps(payload).encode("utf-8"),
+                                    timeout=OPEN_FILE_TIMEOUT + 30)
+        result = json.loads(body or b"{}")
+        if status != 200 or not result.get("success"):
+            raise RuntimeError(f"Could not open {blend_file}: {result.get('stderr') or result.get('error')}")
+        self.blend_file = blend_file
+
+    @contextlib.contextmanager
+    def using_file(self, blend_file, timeout=FORWARD_TIMEOUT):
+        """Keeps blend_file open on this worker until the caller's job is done.
+
+        Jobs for the open file share it; switching to another file waits for them to finish.
+        """
+        deadline = time.time() + timeout
+        with self.file_lock:
+            while self.blend_file != blend_file and self.file_users:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise WorkerBusy(f"Worker {self.index} is busy with {self.blend_file}")
+                self.file_lock.wait(remaining)
+            if self.blend_file != blend_file:
+                self.open_file(blend_file)
+            self.file_users += 1
+        try:
+            yield
+        finally:
+            with self.file_lock:
+                self.file_users -= 1
+                self.file_lock.notify_all()
+
+    def describe(self):
+        return {
+            "index": self.index,
+            "pid": self.process.pid if self.process else None,
+            "alive": self.alive,
+            "ready": self.ready.is_set(),
+            "port": self.port,
+            "blend_file": self.blend_file,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failures": self.failures,
+            "restarts": self.restarts,
+        }
+
+
+class WorkerPool:
+    """Schedules jobs across workers by load, with optional sticky affinity."""
+
+    def __init__(self, workers):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._affinity = {} # affinity key -> worker index
+        self._stopping = threading.Event()
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    def stop(self):
+        self._stopping.set()
+        for worker in self.workers:
+            worker.stop()
+
+    def _monitor(self):
+        """Restarts workers whose process exited, each on its own backoff schedule."""
+        while not self._stopping.wait(0.5):
+            now = time.time()
+            for worker in self.workers:
+                if not worker.process or worker.alive or self._stopping.is_set():
+                    continue
+                if worker.restart_at is None:
+                    delay = RESTART_BACKOFF[min(worker.restarts, len(RESTART_BACKOFF) - 1)]
+                    print(f"[Dispatcher] Worker {worker.index}: exited with code "
+                          f"{worker.process.returncode}, restarting in {delay}s")
+                    worker.ready.clear()
+                    worker.restart_at = now + delay
+                elif now >= worker.restart_at:
+                    worker.restart_at = None
+                    worker.restarts += 1
+                    worker.start()
+
+    def acquire(self, affinity=None, timeout=WORKER_START_TIMEOUT, exclude=()):
+        """Picks a ready worker (other than those in exclude) and reserves a slot on it."""
+        deadline = time.time() + timeout
+        while True:
+            with self._lock:
+                ready = [w for w in self.workers if w.ready.is_set() and w.alive and w not in exclude]
+                worker = None
+                if affinity is not None and affinity in self._affinity:
+                    pinned = self.workers[self._affinity[affinity]]
+                    if pinned in ready:
+                        worker = pinned
+                if worker is None and ready:
+                    worker = min(ready, key=lambda w: (w.in_flight, w.completed))
+                    if affinity is not None:
+                        self._affinity[affinity] = worker.index
+                if worker is not None:
+                    worker.in_flight += 1
+                    return worker
+            if time.time() > deadline:
+                return None
+            time.sleep(0.05)
+
+    def release(self, worker, ok):
+        with self._lock:
+            worker.in_flight -= 1
+            if ok:
+                worker.completed += 1
+            else:
+                worker.failures += 1
+
+    def describe(self):
+        with self._lock:
+            return {
+                "workers": [w.describe() for w in self.workers],
+                "affinity": dict(self._affinity),
+            }
+
+
+class DispatcherHandler(http.server.BaseHTTPRequestHandler):
+    pool = None
+    token = None
+
+    def log_message(self, format, *args): pass # Silence logs
+
+    def _send(self, status, data):
+        body = data if isinstance(data, bytes) else json.dumps(data).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-type', 'application/json')
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass # Client went away
+
+    def _authorized(self):
+        token = self.headers.get('X-Blender-Token', '')
+        auth = self.headers.get('Authorization', '')
+        if not token and auth.startswith('Bearer '):
+            token = auth[7:].strip()
+        if token == self.token:
+            return True
+        self._send(401, {'error': 'Invalid or missing token'})
+        return False
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type, X-Blender-Token, Authorization')
+        self.end_headers()
+
+    @staticmethod
+    def _tag_id(body, worker):
+        """Prefixes the execution id in a JSON response with the worker index."""
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return body
+        if not isinstance(data, dict) or not isinstance(data.get('id'), str):
+            return body
+        data['id'] = f"{worker.index}-{data['id']}"
+        return json.dumps(data).encode("utf-8")
+
+    def _relay(self, resp, worker):
+        """Passes a worker response on; NDJSON streams are relayed line by line.
+
+        Returns False if the worker's response broke off. A client that went away is not a worker failure.
+        """
+        content_type = resp.getheader('Content-type', 'application/json')
+        if not content_type.startswith('application/x-ndjson'):
+            try:
+                data = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                self._send(502, {'error': f'Worker {worker.index} failed: {e}'})
+                return False
+            self._send(resp.status, self._tag_id(data, worker))
+            return True
+        try:
+            self.send_response(resp.status)
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.send_header('Content-type', content_type)
+            self.end_headers()
+        except (BrokenPipeError, ConnectionResetError):
+            return True
+        while True:
+            try:
+                line = resp.readline()
+            except (OSError, http.client.HTTPException) as e:
+                print(f"[Dispatcher] Worker {worker.index}: stream broke off: {e}")
+                return False
+            if not line:
+                return True
+            try:
+                self.wfile.write(self._tag_id(line, worker).rstrip(b"\n") + b"\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return True
+
+    def _poll_output(self):
+        """Forwards GET /execute/output to the worker whose index prefixes the id."""
+        parts = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parts.query)
+        index, _, execution_id = query.get('id', [''])[0].partition('-')
+        if not index.isdigit() or int(index) >= len(self.pool.workers) or not execution_id:
+            self._send(404, {'error': 'Unknown execution id'})
+            return
+        worker = self.pool.workers[int(index)]
+        if not worker.ready.is_set():
+            self._send(404, {'error': f'Worker {worker.index} restarted; the execution is gone'})
+            return
+        query['id'] = [execution_id]
+        try:
+            status, body = worker.request("GET", f"{parts.path}?{urllib.parse.urlencode(query, doseq=True)}")
+        except Exception as e:
+            self._send(502, {'error': f'Worker {worker.index} failed: {e}'})
+            return
+        self._send(status, self._tag_id(body, worker))
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path == '/':
+            self._send(200, {'status': 'Gemini Dispatcher Online', 'workers': len(self.pool.workers)})
+        elif self.path == '/workers':
+            self._send(200, self.pool.describe())
+        elif self.path.startswith('/execute/output'):
+            self._poll_output()
+        else:
+            self._send(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path not in FORWARD_PATHS:
+            self._send(404, {'error': 'Not found'})
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            self._send(400, {'error': 'Invalid JSON'})
+            return
+        blend_file = payload.pop('blend_file', None)
+        affinity = payload.pop('affinity', None) or blend_file
+        body = json.dumps(payload).encode("utf-8")
+
+        refused = []
+        for attempt in range(2):
+            worker = self.pool.acquire(affinity, exclude=refused)
+            if worker is None:
+                self._send(503, {'error': 'No worker available'})
+                return
+            ok = False
+            try:
+                # The bridge runs jobs in arrival order, so holding the file lease until the
+                # response is back keeps another file from being opened underneath this job.
+                with contextlib.ExitStack() as lease:
+                    try:
+                        if blend_file:
+                            lease.enter_context(worker.using_file(blend_file))
+                        conn, resp = worker.open("POST", self.path, body)
+                    except ConnectionRefusedError as e:
+                        # Nothing was delivered (the worker is exiting), so another worker may run the job.
+                        # Any later error could come after the job ran and is never replayed.
+                        print(f"[Dispatcher] Worker {worker.index}: {e}")
+                        refused.append(worker)
+                        if attempt:
+                            self._send(502, {'error': f'Worker {worker.index} unavailable: {e}'})
+                        continue
+                    except WorkerBusy as e:
+                        self._send(503, {'error': str(e)})
+                        return
+                    except Exception as e:
+                        self._send(502, {'error': f'Worker {worker.index} failed: {e}'})
+                        return
+                    try:
+                        ok = self._relay(resp, worker) and resp.status < 500
+                    finally:
+                        conn.close()
+                    return
+            finally:
+                self.pool.release(worker, ok)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dispatch Gemini Bridge jobs across headless Blender workers.")
+    parser.add_argument("--blender", default=os.environ.get("BLENDER_BIN", "blender"), help="Blender executable")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--blend", nargs="*", default=[],
+                        help="Blend files to preload; assigned to workers round-robin")
+    parser.add_argument("--token", default=None, help="Client token (default: random)")
+    args = parser.parse_args(argv)
+
+    workers = [Worker(i, args.blender, args.blend[i % len(args.blend)] if args.blend else None)
+               for i in range(args.workers)]
+    pool = WorkerPool(workers)
+    DispatcherHandler.pool = pool
+    DispatcherHandler.token = args.token or secrets.token_urlsafe(32)
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', args.port), DispatcherHandler)
+    server.daemon_threads = True
+
+    def shutdown(*_):
+        print("[Dispatcher] Stopping...")
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    pool.start()
+    print(f"[Dispatcher] Listening on port {args.port} with {args.workers} workers")
+    print(f"[Dispatcher] Token: {DispatcherHandler.token}")
+    try:
+        server.serve_forever()
+    finally:
+        pool.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,6 @@
 
 import { useState, useEffect, useCallback } from 'react';
-import { ChatSession, CustomTool, ExecutionResult, GraphData, ScreenshotResult } from '../types';
+import { BulkSetResult, ChatSession, CheckpointResult, ContextResult, CustomTool, ExecutionResult, GraphChangeset, GraphData, ScreenshotResult, ToolSaveResult } from '../types';
 
 export const useBlender = (port: number, token: string) => {
   const [isConnected, setIsConnected] = useState(false);
@@ -44,7 +44,7 @@ export const useBlender = (port: number, token: string) => {
     return res.json();
   };
 
-  const executeCode = useCallback(async (code: string): Promise<ExecutionResult> => {
+  const executeCode = useCallback(async (code: string, options: { profile?: boolean } = {}): Promise<ExecutionResult> => {
     if (!token) {
       return {
         success: false,
@@ -53,11 +53,12 @@ export const useBlender = (port: number, token: string) => {
       };
     }
     try {
-      const result = await postJson('/execute', { code });
+      const result = await postJson('/execute', options.profile ? { code, profile: 'all' } : { code });
       return {
         success: result.success,
         stdout: result.stdout || '',
-        stderr: result.stderr || result.error || ''
+        stderr: result.stderr || result.error || '',
+        profile: result.profile
       };
     } catch (e: any) {
       return {
@@ -131,14 +132,28 @@ export const useBlender = (port: number, token: string) => {
     return [];
   }, [baseUrl, isConnected, token]);
 
-  const saveTool = useCallback(async (tool: CustomTool): Promise<boolean> => {
-    if (!isConnected) return false;
+  const saveTool = useCallback(async (tool: CustomTool): Promise<ToolSaveResult> => {
+    if (!isConnected) return { success: false, error: "Not connected" };
     try {
-        await postJson('/tools', tool);
-        return true;
-    } catch (e) { return false; }
+        const result = await postJson('/tools', tool);
+        return { success: result.success !== false, error: result.error };
+    } catch (e) { return { success: false, error: "Network Error" }; }
   }, [baseUrl, isConnected, token]);
 
+  const runTool = useCallback(async (trigger: string, args: Record<string, any> = {}): Promise<ExecutionResult> => {
+    if (!isConnected) return { success: false, stdout: '', stderr: 'Not connected' };
+    try {
+        const result = await postJson('/tools/run', { trigger, args });
+        return {
+            success: !!result.success,
+            stdout: result.stdout || '',
+            stderr: result.stderr || result.error || ''
+        };
+    } catch (e) {
+        return { success: false, stdout: '', stderr: `Network Error: Could not connect to Blender on port ${port}.` };
+    }
+  }, [baseUrl, isConnected, port, token]);
+
   const deleteTool = useCallback(async (trigger: string): Promise<boolean> => {
     if (!isConnected) return false;
     try {
@@ -162,6 +177,46 @@ export const useBlender = (port: number, token: string) => {
     return { nodes:[], links:[], error: "Failed to inspect" };
   }, [baseUrl, isConnected, token]);
 
+  const applyGraph = useCallback(async (graph: any, options: { dryRun?: boolean; removeMissing?: boolean } = {}): Promise<GraphChangeset> => {
+    if (!isConnected) return { error: "Not connected" };
+    try {
+        return await postJson('/graph/apply', {
+            graph,
+            dry_run: !!options.dryRun,
+            remove_missing: !!options.removeMissing
+        });
+    } catch (e) {
+        return { error: `Network Error: Could not connect to Blender on port ${port}.` };
+    }
+  }, [baseUrl, isConnected, port, token]);
+
+  const setObjects = useCallback(async (request: Record<string, any>): Promise<BulkSetResult> => {
+    if (!isConnected) return { error: "Not connected" };
+    try {
+        return await postJson('/objects/set', request);
+    } catch (e) {
+        return { error: `Network Error: Could not connect to Blender on port ${port}.` };
+    }
+  }, [baseUrl, isConnected, port, token]);
+
+  const checkpoint = useCallback(async (action: 'save' | 'restore', name?: string, force = false): Promise<CheckpointResult> => {
+    if (!isConnected) return { error: "Not connected" };
+    try {
+        return await postJson(action === 'save' ? '/checkpoint' : '/restore', { ...(name ? { name } : {}), ...(force ? { force } : {}) });
+    } catch (e) {
+        return { error: `Network Error: Could not connect to Blender on port ${port}.` };
+    }
+  }, [baseUrl, isConnected, port, token]);
+
+  const fetchContext = useCallback(async (query: string, maxTokens: number, sections?: string[]): Promise<ContextResult> => {
+    if (!isConnected) return { error: "Not connected" };
+    try {
+        return await postJson('/context', sections ? { query, max_tokens: maxTokens, sections } : { query, max_tokens: maxTokens });
+    } catch (e) {
+        return { error: `Network Error: Could not connect to Blender on port ${port}.` };
+    }
+  }, [baseUrl, isConnected, port, token]);
+
   const getScreenshot = useCallback(async (): Promise<ScreenshotResult> => {
     if (!isConnected) return { success: false };
     try {
@@ -175,7 +230,7 @@ export const useBlender = (port: number, token: string) => {
 
   return { 
     isConnected, executeCode, fetchHistory, saveHistory, 
-    fetchMemory, appendMemory, overwriteMemory, fetchTools, saveTool, deleteTool, 
-    inspectGraph, getScreenshot 
+    fetchMemory, appendMemory, overwriteMemory, fetchTools, saveTool, runTool, deleteTool, 
+    inspectGraph, applyGraph, setObjects, checkpoint, fetchContext, getScreenshot 
   };
 };
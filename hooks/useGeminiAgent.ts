@@ -1,6 +1,6 @@
 import { useState, useRef } from 'react';
 import { GoogleGenAI } from "@google/genai";
-import { Settings, CustomTool, Message, ExecutionResult, ScreenshotResult, GraphData } from '../types';
+import { Settings, CustomTool, Message, ExecutionResult, ScreenshotResult, GraphData, GraphChangeset, BulkSetResult, CheckpointResult, ContextResult, ToolSaveResult } from '../types';
 import { generateSystemPrompt } from '../utils/prompts';
 import { 
   performSemanticSearch, 
@@ -18,10 +18,15 @@ interface UseGeminiAgentProps {
   blenderFunctions: {
     appendMemory: (fact: string) => Promise<boolean>;
     fetchMemory: () => Promise<string>;
-    saveTool: (tool: CustomTool) => Promise<boolean>;
+    saveTool: (tool: CustomTool) => Promise<ToolSaveResult>;
+    runTool: (trigger: string, args?: Record<string, any>) => Promise<ExecutionResult>;
     fetchTools: () => Promise<CustomTool[]>;
-    executeCode: (code: string) => Promise<ExecutionResult>;
+    executeCode: (code: string, options?: { profile?: boolean }) => Promise<ExecutionResult>;
     inspectGraph: () => Promise<GraphData>;
+    applyGraph: (graph: any, options?: { dryRun?: boolean; removeMissing?: boolean }) => Promise<GraphChangeset>;
+    setObjects: (request: Record<string, any>) => Promise<BulkSetResult>;
+    checkpoint: (action: 'save' | 'restore', name?: string, force?: boolean) => Promise<CheckpointResult>;
+    fetchContext: (query: string, maxTokens: number, sections?: string[]) => Promise<ContextResult>;
     getScreenshot: () => Promise<ScreenshotResult>;
   };
   onMemoryUpdate: (content: string) => void;
@@ -77,6 +82,12 @@ export const useGeminiAgent = ({
          }
     }
 
+    // 1b. Scene context, built and budgeted by the bridge in one call (memory is already in the system prompt)
+    const sceneContext = await blenderFunctions.fetchContext(text, 1500, ['active_object', 'graph', 'changes']);
+    if (sceneContext.context) {
+        augmentedText = `${augmentedText}\n\n### CURRENT BLENDER CONTEXT\n${sceneContext.context}`;
+    }
+
     // 2. Construct Request
     const parts: any[] = [];
     if (attachment) {
@@ -304,21 +315,25 @@ async function handleToolCall(
                     trigger: args.trigger, 
                     code: args.code 
                 };
-                const success = await funcs.saveTool(tool);
-                if (success) {
+                const saved = await funcs.saveTool(tool);
+                if (saved.success) {
                     const updated = await funcs.fetchTools();
                     onToolUpdate(updated);
                     resultStr = `Tool '${args.trigger}' created.`;
                     logText = `*Created new tool: ${args.name} (${args.trigger})*`;
                 } else {
-                    resultStr = "Failed to create tool.";
+                    resultStr = saved.error ? `Failed to create tool. ${saved.error}` : "Failed to create tool.";
                 }
                 break;
             }
             case 'run_tool': {
                 const tool = tools.find(t => t.trigger === args.trigger);
                 if (tool) {
-                    const res = await funcs.executeCode(tool.code);
+                    let toolArgs = {};
+                    if (args.args) {
+                        try { toolArgs = JSON.parse(args.args); } catch (e) { }
+                    }
+                    const res = await funcs.runTool(tool.trigger, toolArgs);
                     resultStr = res.success 
                         ? `Executed. Stdout: ${res.stdout}` 
                         : `Failed. Stderr: ${res.stderr}`;
@@ -346,6 +361,66 @@ ${res.stderr.trim()}\n\
                 logText = `*Inspected Graph: ${nodeCount} nodes found.*`;
                 break;
             }
+            case 'apply_graph': {
+                let graph: any;
+                try {
+                    graph = JSON.parse(args.graph);
+                } catch (e) {
+                    resultStr = "Invalid 'graph' JSON.";
+                    break;
+                }
+                const res = await funcs.applyGraph(graph, { dryRun: !!args.dry_run, removeMissing: args.remove_missing === true });
+                resultStr = JSON.stringify(res);
+                const icon = res.error || (res.errors && res.errors.length) ? '❌' : '✅';
+                logText = res.error
+                    ? `*${icon} Apply Graph failed: ${res.error}*`
+                    : `*${icon} ${res.dry_run ? 'Planned' : 'Applied'} ${res.changes ?? 0} graph changes*`;
+                break;
+            }
+            case 'set_objects': {
+                const request: Record<string, any> = {};
+                for (const key of ['collection', 'pattern', 'names', 'modifier', 'dry_run']) {
+                    if (args[key] !== undefined) request[key] = args[key];
+                }
+                try {
+                    if (args.properties) request.properties = JSON.parse(args.properties);
+                    if (args.modifier_inputs) request.modifier_inputs = JSON.parse(args.modifier_inputs);
+                } catch (e) {
+                    resultStr = "Invalid 'properties' or 'modifier_inputs' JSON.";
+                    break;
+                }
+                const res = await funcs.setObjects(request);
+                resultStr = JSON.stringify(res);
+                const failed = res.failures ? Object.keys(res.failures).length : 0;
+                const icon = res.error || failed ? '❌' : '✅';
+                logText = res.error
+                    ? `*${icon} Bulk edit failed: ${res.error}*`
+                    : `*${icon} Bulk edit on ${res.count ?? 0} objects*`;
+                break;
+            }
+            case 'save_checkpoint':
+            case 'restore_checkpoint': {
+                const action = name === 'save_checkpoint' ? 'save' : 'restore';
+                let res = await funcs.checkpoint(action, args.name);
+                // Unsaved work would be discarded: only the user can allow that, never the model.
+                if (res.unsaved_changes) {
+                    const ok = window.confirm(
+                        `The assistant wants to restore checkpoint '${args.name || 'latest'}'.\n\n` +
+                        `Blender has unsaved changes that will be discarded, and the open file will become the checkpoint copy. Continue?`
+                    );
+                    res = ok
+                        ? await funcs.checkpoint(action, args.name, true)
+                        : { error: 'The user declined to discard unsaved changes. Ask them to save the file first.' };
+                }
+                resultStr = JSON.stringify(res);
+                logText = res.error
+                    ? `*❌ Checkpoint ${action} failed: ${res.error}*`
+                    : `*✅ ${action === 'save' ? 'Saved' : 'Restored'} checkpoint '${res.name}' in ${res.elapsed}s*`;
+                if (res.warning) {
+                    logText += `\n\n*⚠️ ${res.warning}*`;
+                }
+                break;
+            }
             case 'get_screenshot': {
                 const data = await funcs.getScreenshot();
                 if (data.success && data.image) {
@@ -358,10 +433,13 @@ ${res.stderr.trim()}\n\
                 break;
             }
             case 'execute_code': {
-                const res = await funcs.executeCode(args.code);
+                const res = await funcs.executeCode(args.code, { profile: !!args.profile });
                 resultStr = res.success 
                     ? `Executed. Stdout: ${res.stdout}` 
                     : `Failed. Stderr: ${res.stderr}`;
+                if (res.profile) {
+                    resultStr += `\nProfile: ${JSON.stringify(res.profile)}`;
+                }
                 const icon = res.success ? '✅' : '❌';
                 logText = `*${icon} Executed Code*\n` + 
                           (res.stdout ? `\
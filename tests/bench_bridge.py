@@ -0,0 +1,232 @@
+"""
+Headless load test for the Gemini Bridge.
+
+Imports gemini_bridge against the fake `bpy` module (tests/fake_bpy.py),
+starts the HTTP server on a free port and drives process_queue() from a pump
+thread, the way Blender's timer would (or run_background() with --pump
+background). Each selected endpoint is then hit
+with N concurrent clients and throughput plus p50/p95/p99 latency are
+reported. Results are written to JSON so runs can be compared across commits.
+
+Usage:
+    python tests/bench_bridge.py --concurrency 8 --requests 500
+    python tests/bench_bridge.py --endpoints execute inspect --output before.json
+    python tests/bench_bridge.py --compare before.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+import subprocess
+import http.client
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+for path in (TESTS_DIR, PROJECT_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import fake_bpy
+
+# name -> (method, path, JSON body or None)
+SCENARIOS = {
+    "health": ("GET", "/", None),
+    "inspect": ("GET", "/inspect", None),
+    "execute": ("POST", "/execute", {"code": "x = sum(range(100))\nprint(x)"}),
+    "execute_session": ("POST", "/execute", {"code": "n = globals().get('n', 0) + 1", "session": "bench"}),
+    "tools": ("GET", "/tools", None),
+    "tools_run": ("POST", "/tools/run", {"trigger": "/bench", "args": {"n": 10}}),
+    "memory": ("GET", "/memory", None),
+    "metrics": ("GET", "/metrics", None),
+}
+DEFAULT_ENDPOINTS = ["health", "inspect", "execute", "tools", "tools_run"]
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+class BridgeUnderTest:
+    """Runs gemini_bridge in-process against fake bpy, with a queue pump thread."""
+
+    def __init__(self, objects, nodes, tick, pump="timer"):
+        fake_bpy.install(objects=objects, nodes=nodes)
+        import gemini_bridge
+        self.bridge = gemini_bridge
+        self.tick = tick
+        self.pump = pump
+        self._stop = threading.Event()
+        self._pump = None
+
+    def start(self):
+        bridge = self.bridge
+        bridge.start_server(port_range=(0, 0)) # Let the OS pick a free port
+        if not bridge.HTTPD:
+            raise RuntimeError(f"Bridge failed to start: {bridge.SERVER_STATUS_MESSAGE}")
+        target = self.bridge.run_background if self.pump == "background" else self._pump_loop
+        self._pump = threading.Thread(target=target, daemon=True)
+        self._pump.start()
+        bridge.TOOL_REGISTRY.put({"name": "bench", "description": "benchmark tool",
+                                  "trigger": "/bench", "code": "print(sum(range(args.get('n', 1))))"})
+        return bridge.PORT, bridge.SERVER_TOKEN
+
+    def _pump_loop(self):
+        # Mimics bpy.app.timers: run the queue, then sleep for the returned interval.
+        while not self._stop.is_set():
+            interval = self.bridge.process_queue()
+            if self.tick is not None:
+                interval = self.tick
+            if interval:
+                time.sleep(interval)
+
+    def stop(self):
+        self._stop.set()
+        if self.pump == "background":
+            self.bridge.stop_background()
+            self._pump.join()
+        self.bridge.stop_server()
+        self.bridge.TOOL_REGISTRY.flush()
+
+
+def run_scenario(port, token, name, total_requests, concurrency):
+    method, path, body = SCENARIOS[name]
+    payload = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"X-Blender-Token": token}
+    if payload is not None:
+        headers["Content-Type"] = "application/json"
+
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def worker():
+        local = []
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    break
+            start = time.perf_counter()
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+                conn.request(method, path, body=payload, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+                conn.close()
+                if resp.status >= 400:
+                    raise RuntimeError(f"HTTP {resp.status}")
+                local.append(time.perf_counter() - start)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall_start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - wall_start
+
+    latencies.sort()
+    ms = lambda v: round(v * 1000, 3) if v is not None else None
+    return {
+        "requests": total_requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "wall_seconds": round(wall, 4),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\nComparison against {baseline_path} (commit {baseline.get('commit')}):")
+    for name, current in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            print(f"  {name:16s} (no baseline)")
+            continue
+        parts = []
+        for key in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            old, new = before.get(key), current.get(key)
+            if old and new:
+                parts.append(f"{key} {old} -> {new} ({(new - old) / old * 100:+.1f}%)")
+        print(f"  {name:16s} " + ", ".join(parts))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test gemini_bridge against a fake bpy.")
+    parser.add_argument("--endpoints", nargs="+", default=DEFAULT_ENDPOINTS, choices=sorted(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--objects", type=int, default=10, help="Synthetic objects in the scene")
+    parser.add_argument("--nodes", type=int, default=50, help="Nodes per synthetic GN tree")
+    parser.add_argument("--pump", choices=("timer", "background"), default="timer",
+                        help="timer: emulate bpy.app.timers; background: run_background() as under `blender -b`")
+    parser.add_argument("--tick", type=float, default=None,
+                        help="Override the pump interval (default: what process_queue returns, like Blender's timer)")
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed requests per endpoint")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="Previous results JSON to diff against")
+    args = parser.parse_args(argv)
+
+    print("========================================")
+    print("Gemini Bridge Load Test (fake bpy)")
+    print("========================================")
+    bridge = BridgeUnderTest(args.objects, args.nodes, args.tick, args.pump)
+    port, token = bridge.start()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "endpoints": {},
+    }
+    try:
+        for name in args.endpoints:
+            if args.warmup:
+                run_scenario(port, token, name, args.warmup, 1)
+            stats = run_scenario(port, token, name, args.requests, args.concurrency)
+            results["endpoints"][name] = stats
+            print(f"[{name:16s}] {stats['throughput_rps']:>9} req/s  p50 {stats['p50_ms']} ms  "
+                  f"p95 {stats['p95_ms']} ms  p99 {stats['p99_ms']} ms  errors {stats['errors']}")
+    finally:
+        bridge.stop()
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0 if all(s["errors"] == 0 for s in results["endpoints"].values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
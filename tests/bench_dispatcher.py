@@ -0,0 +1,160 @@
+"""
+Scaling benchmark for gemini_dispatcher.py.
+
+Starts the dispatcher with 1, 2, 4, ... workers and pushes the same batch of
+jobs through it with enough concurrency to keep every worker busy. Reports
+throughput and speedup over one worker. By default the workers are
+tests/fake_blender.py (no Blender needed); pass --blender to use the real one.
+
+Two job kinds separate the two things being measured:
+    cpu    pure-Python loop; speedup is bounded by the number of cores
+    sleep  time.sleep; speedup shows the dispatcher's own overhead
+
+Usage:
+    python tests/bench_dispatcher.py --workers 1 2 4 8 --jobs 64
+    python tests/bench_dispatcher.py --blender /path/to/blender --kind cpu
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import secrets
+import platform
+import threading
+import subprocess
+import http.client
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+DISPATCHER = os.path.join(PROJECT_ROOT, "gemini_dispatcher.py")
+FAKE_BLENDER = os.path.join(TESTS_DIR, "fake_blender.py")
+
+JOBS = {
+    "cpu": "s = 0\nfor i in range({n}):\n    s += i * i\nprint(s)",
+    "sleep": "import time\ntime.sleep({n} / 1e7)", # Same nominal length as the cpu job
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(port, token, method, path, body=None, timeout=600):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                     headers={"X-Blender-Token": token, "Content-Type": "application/json"})
+        resp = conn.getresponse()
+        return resp.status, json.loads(resp.read() or b"null")
+    finally:
+        conn.close()
+
+
+class Dispatcher:
+    """A dispatcher subprocess with N workers."""
+
+    def __init__(self, blender, workers):
+        self.port = free_port()
+        self.token = secrets.token_urlsafe(16)
+        self.workers = workers
+        self.process = subprocess.Popen(
+            [sys.executable, DISPATCHER, "--blender", blender, "--workers", str(workers),
+             "--port", str(self.port), "--token", self.token],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=PROJECT_ROOT)
+
+    def wait_ready(self, timeout=120):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            try:
+                status, data = request(self.port, self.token, "GET", "/workers", timeout=5)
+                if status == 200 and all(w["ready"] for w in data["workers"]):
+                    return
+            except (OSError, ValueError):
+                pass
+            time.sleep(0.2)
+        raise RuntimeError(f"Dispatcher with {self.workers} workers did not become ready")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def run_jobs(dispatcher, code, jobs, concurrency):
+    """Runs `jobs` executions with `concurrency` clients; returns (seconds, errors)."""
+    remaining = iter(range(jobs))
+    lock = threading.Lock()
+    errors = []
+
+    def client():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            try:
+                status, data = request(dispatcher.port, dispatcher.token, "POST", "/execute", {"code": code})
+                if status != 200 or not data.get("success"):
+                    errors.append(data)
+            except Exception as e:
+                errors.append(str(e))
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - start, len(errors)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure gemini_dispatcher throughput against the worker count.")
+    parser.add_argument("--blender", default=FAKE_BLENDER, help="Blender executable (default: fake bpy launcher)")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Worker counts to try (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--kind", choices=sorted(JOBS), nargs="+", default=sorted(JOBS))
+    parser.add_argument("--jobs", type=int, default=32, help="Jobs per run")
+    parser.add_argument("--size", type=int, default=2_000_000, help="Loop iterations per job")
+    parser.add_argument("--output", default="bench_dispatcher.json")
+    args = parser.parse_args(argv)
+
+    cpus = os.cpu_count() or 1
+    counts = args.workers or sorted({1, cpus} | {2 ** i for i in range(8) if 2 ** i <= cpus})
+    print("========================================")
+    print(f"Gemini Dispatcher Scaling ({cpus} CPUs)")
+    print("========================================")
+
+    results = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+               "platform": platform.platform(), "cpus": cpus, "blender": args.blender, "runs": []}
+    baseline = {}
+    for workers in counts:
+        dispatcher = Dispatcher(args.blender, workers)
+        try:
+            dispatcher.wait_ready()
+            for kind in args.kind:
+                code = JOBS[kind].format(n=args.size)
+                run_jobs(dispatcher, code, workers, workers) # Warm up every worker
+                seconds, errors = run_jobs(dispatcher, code, args.jobs, workers * 2)
+                rate = args.jobs / seconds
+                baseline.setdefault(kind, rate)
+                speedup = rate / baseline[kind]
+                results["runs"].append({"kind": kind, "workers": workers, "jobs_per_s": round(rate, 2),
+                                        "speedup": round(speedup, 2), "errors": errors})
+                print(f"[{kind:5s}] {workers:3d} workers  {rate:8.2f} jobs/s  speedup {speedup:5.2f}x  errors {errors}")
+        finally:
+            dispatcher.stop()
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""
+Scaling micro-benchmarks for node graph serialization.
+
+Measures GraphSerializer.serialize (alone and with JSON encoding),
+GraphSerializer.get_socket_value and BridgeCore.inspect_active_graph on
+synthetic node trees from tests/fake_bpy.py, from 100 up to 50k nodes.
+Time is the fastest single call out of at least --repeats calls; fast cases
+keep sampling for MIN_MEASURE_SECONDS. Every call is bracketed by a short fixed
+calibration workload and the median call/calibration ratio is stored as
+"relative", so a host that is slower for seconds at a time (shared or
+throttled machines) slows both sides equally. Peak memory is measured in a
+separate tracemalloc run so tracing doesn't skew the timings.
+
+Regression gate: pass --baseline with a previous results file and the run
+fails (exit code 1) if any case got slower by more than --threshold and by
+more than --min-delta-ms (so timer noise on sub-millisecond cases can't trip
+it), or its peak memory grew by more than --threshold and MIN_DELTA_KB.
+Comparisons use "relative" when both files have it: the baseline time is
+rescaled as current seconds * old relative / new relative before the checks.
+
+Usage:
+    python tests/bench_graph.py --output graph_baseline.json
+    python tests/bench_graph.py --baseline graph_baseline.json --threshold 0.25
+"""
+import os
+import sys
+import gc
+import json
+import statistics
+import time
+import argparse
+import platform
+import tracemalloc
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(TESTS_DIR)
+for path in (TESTS_DIR, PROJECT_ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import fake_bpy
+
+DEFAULT_SIZES = [100, 500, 1000, 5000, 10000, 50000]
+MIN_MEASURE_SECONDS = 3.0 # Fast cases keep timing single calls for at least this long
+MIN_DELTA_KB = 64 # Peak memory growth below this is never a regression
+CALIBRATION_ITEMS = 200 # Size of the fixed workload used to normalise host speed
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def calibration_workload():
+    """Fixed dict-building + JSON work, similar in kind to serialization but independent of the addon."""
+    data = [{"name": f"Node_{i}", "type": "MATH", "inputs": [{"name": "Value", "default_value": i * 0.5}] * 2}
+            for i in range(CALIBRATION_ITEMS)]
+    return json.dumps(data)
+
+
+def measure(func, repeats):
+    """Returns (best seconds per call, median time relative to calibration, peak traced bytes) for func()."""
+    gc.collect()
+    best = None
+    ratios = []
+    gc.disable() # As timeit does: cyclic collections would land in random samples
+    try:
+        before = timed(calibration_workload)
+        deadline = time.perf_counter() + MIN_MEASURE_SECONDS
+        while len(ratios) < repeats or time.perf_counter() < deadline:
+            elapsed = timed(func)
+            after = timed(calibration_workload)
+            best = elapsed if best is None else min(best, elapsed)
+            ratios.append(elapsed * 2 / (before + after))
+            before = after
+    finally:
+        gc.enable()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, statistics.median(ratios), peak
+
+
+def bench_size(bridge, bpy, n_nodes, fan_out, repeats):
+    tree = fake_bpy.make_node_tree(n_nodes, fan_out=fan_out)
+    sockets = [sock for node in tree.nodes for sock in node.inputs]
+
+    obj = fake_bpy.Object(f"Bench_{n_nodes}")
+    mod = fake_bpy.Modifier("GeometryNodes", "NODES", tree)
+    mod.is_active = True
+    obj.modifiers.append(mod)
+    bpy.context.active_object = obj
+
+    cases = {
+        "serialize": lambda: bridge.GraphSerializer.serialize(tree),
+        "serialize_json": lambda: json.dumps(bridge.GraphSerializer.serialize(tree), cls=bridge.BlenderJSONEncoder),
+        "get_socket_value": lambda: [bridge.GraphSerializer.get_socket_value(s) for s in sockets],
+        "inspect_active_graph": lambda: json.dumps(bridge.BridgeCore.inspect_active_graph(), cls=bridge.BlenderJSONEncoder),
+    }
+    results = {"nodes": n_nodes, "links": len(tree.links), "sockets": len(sockets)}
+    for name, func in cases.items():
+        seconds, relative, peak = measure(func, repeats)
+        results[name] = {
+            "seconds": round(seconds, 6),
+            "relative": round(relative, 4),
+            "us_per_node": round(seconds / n_nodes * 1e6, 3),
+            "peak_kb": round(peak / 1024, 1),
+        }
+    results["json_kb"] = round(len(cases["serialize_json"]()) / 1024, 1)
+    return results
+
+
+def check_regressions(results, baseline_path, threshold, min_delta_seconds):
+    """Returns a list of human-readable regressions beyond threshold and the minimum deltas."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {str(r["nodes"]): r for r in baseline.get("sizes", [])}
+    failures = []
+    for current in results["sizes"]:
+        before = previous.get(str(current["nodes"]))
+        if not before:
+            continue
+        for case, stats in current.items():
+            if not isinstance(stats, dict) or case not in before:
+                continue
+            for metric, min_delta in (("seconds", min_delta_seconds), ("peak_kb", MIN_DELTA_KB)):
+                old, new = before[case][metric], stats[metric]
+                if metric == "seconds" and before[case].get("relative") and stats.get("relative"):
+                    # Baseline time as it would run on the host right now
+                    old = round(new * before[case]["relative"] / stats["relative"], 6)
+                if old and new > old * (1 + threshold) and new - old > min_delta:
+                    failures.append(f"{case} @ {current['nodes']} nodes: {metric} {old} -> {new} "
+                                    f"(+{(new - old) / old * 100:.1f}%)")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="GraphSerializer scaling benchmarks.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--fan-out", type=int, default=2, help="Incoming links per node")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--output", default="bench_results_graph.json")
+    parser.add_argument("--baseline", help="Previous results JSON to gate against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown/growth vs baseline as a fraction (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="Slowdowns smaller than this many milliseconds never fail the gate")
+    args = parser.parse_args(argv)
+
+    bpy = fake_bpy.install(objects=0)
+    import gemini_bridge
+
+    print("========================================")
+    print("GraphSerializer Scaling Benchmarks")
+    print("========================================")
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {"fan_out": args.fan_out, "repeats": args.repeats},
+        "sizes": [],
+    }
+    for n in args.sizes:
+        row = bench_size(gemini_bridge, bpy, n, args.fan_out, args.repeats)
+        results["sizes"].append(row)
+        print(f"[{n:>6} nodes] serialize {row['serialize']['seconds'] * 1000:9.2f} ms  "
+              f"+json {row['serialize_json']['seconds'] * 1000:9.2f} ms  "
+              f"inspect {row['inspect_active_graph']['seconds'] * 1000:9.2f} ms  "
+              f"peak {row['serialize_json']['peak_kb']:9.1f} KB  json {row['json_kb']} KB")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        failures = check_regressions(results, args.baseline, args.threshold, args.min_delta_ms / 1000)
+        if failures:
+            print(f"\n❌ {len(failures)} regression(s) beyond {args.threshold * 100:.0f}%:")
+            for line in failures:
+                print(f"   {line}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.threshold * 100:.0f}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,6 @@
 import bpy
 import sys
 import os
-import time
 
 # Add the project root to sys.path so we can import gemini_bridge
 # This assumes the script is located in <project_root>/tests/
@@ -23,33 +22,11 @@ except ImportError as e:
 print("[-] E2E Wrapper: Registering Gemini Bridge...")
 gemini_bridge.register()
 
-print("[-] E2E Wrapper: Bridge registered. Keeping process alive...")
-
-# Keep alive loop to prevent Blender from exiting in headless mode
+# bpy.app.timers never fire in background mode, so the bridge's own loop
+# runs queued requests on this (main) thread until SIGINT/SIGTERM.
+print("[-] E2E Wrapper: Bridge registered. Running background loop...")
 try:
-    while True:
-        # We need to process the events/timers if we want the server queue to work?
-        # gemini_bridge uses bpy.app.timers to process the queue.
-        # In headless mode, timers might not fire if the event loop isn't running?
-        # But wait, 'bpy.app.timers' relies on the main loop.
-        # A simple while True: sleep(1) blocks the main thread.
-        # If the main thread is blocked, bpy.app.timers won't fire.
-        
-        # We need to step the window manager or allow timers to run.
-        # But we can't easily "step" the loop in python without blocking.
-        
-        # However, the Server runs in a separate thread.
-        # The Server accepts requests and puts them in EXECUTION_QUEUE.
-        # The process_queue function is registered with bpy.app.timers.
-        # If the main thread is sleeping in a while loop, timers WON'T run.
-        
-        # Attempt to update the window manager?
-        # In background mode, this is tricky.
-        
-        # Alternative: Call process_queue manually in our loop.
-        gemini_bridge.process_queue()
-        time.sleep(0.05)
-        
-except KeyboardInterrupt:
+    gemini_bridge.run_background()
+finally:
     print("[-] E2E Wrapper: Stopping...")
     gemini_bridge.unregister()
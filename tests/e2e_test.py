@@ -3,6 +3,7 @@ import time
 import requests
 import sys
 import os
+import json
 import signal
 
 # Adjust this if 'blender' is not in PATH
@@ -49,12 +50,12 @@ def run_e2e_test():
                 if "[Gemini]" in clean_line:
                     print(f"[BLENDER] {clean_line}")
                 
-                if "[Gemini] TOKEN:" in clean_line:
-                    token = clean_line.split("TOKEN:")[1].strip()
-                    print(f"✅ Captured Token: {token}")
-                
-                if "[Gemini] Server started on port" in clean_line:
-                    print("✅ Server signal received.")
+                if clean_line.startswith("[Gemini] Ready:"):
+                    # Machine-readable record printed by run_background() once requests are served.
+                    ready = json.loads(clean_line.split("Ready:", 1)[1])
+                    token = ready["token"]
+                    base_url = f"http://localhost:{ready['port']}"
+                    print(f"✅ Server ready on port {ready['port']} (pid {ready['pid']}), token captured.")
                     server_ready = True
             
             if token and server_ready:
@@ -69,9 +70,6 @@ def run_e2e_test():
         if not token or not server_ready:
             raise TimeoutError("Timed out waiting for Blender Server or Token")
 
-        # Wait a beat for the socket to be truly open
-        time.sleep(2)
-
         headers = {"X-Blender-Token": token}
 
         # 1. Health Check
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Stand-in for the `blender` executable, backed by tests/fake_bpy.py.
+
+Accepts the command line gemini_dispatcher.py uses (`-b`, `--factory-startup`,
+an optional .blend, `--python <script>`), installs the fake `bpy` and runs the
+script, so the worker pool can be benchmarked without Blender:
+    python gemini_dispatcher.py --blender tests/fake_blender.py --workers 4
+"""
+import os
+import sys
+import runpy
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, TESTS_DIR)
+
+import fake_bpy
+
+
+def main(argv):
+    if "--python" not in argv:
+        print("fake_blender: nothing to run (pass --python <script>)")
+        return 0
+    script = argv[argv.index("--python") + 1]
+    fake_bpy.install()
+    runpy.run_path(script, run_name="__main__")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
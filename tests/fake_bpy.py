@@ -0,0 +1,367 @@
+"""
+Minimal stand-in for Blender's `bpy` module.
+
+Lets `gemini_bridge` be imported and driven outside Blender (benchmarks,
+load tests). It only implements what the bridge touches: addon
+registration stubs, timers, user_resource, and a synthetic scene of
+objects with Geometry Nodes modifiers.
+
+Usage:
+    import fake_bpy
+    bpy = fake_bpy.install(objects=50, nodes=200)
+    import gemini_bridge
+"""
+import os
+import sys
+import types
+import random
+import tempfile
+
+
+# ------------------------------------------------------------------------------
+# Math types
+# ------------------------------------------------------------------------------
+
+class Vector:
+    """Tiny mathutils.Vector look-alike (iterable, indexable, to_tuple)."""
+    __slots__ = ("_v",)
+
+    def __init__(self, values=(0.0, 0.0, 0.0)):
+        self._v = list(values)
+
+    def __iter__(self): return iter(self._v)
+    def __len__(self): return len(self._v)
+    def __getitem__(self, i): return self._v[i]
+    def __setitem__(self, i, value): self._v[i] = value
+    def to_tuple(self): return tuple(self._v)
+    def __repr__(self): return f"Vector({tuple(self._v)})"
+
+    x = property(lambda self: self._v[0], lambda self, v: self._v.__setitem__(0, v))
+    y = property(lambda self: self._v[1], lambda self, v: self._v.__setitem__(1, v))
+    z = property(lambda self: self._v[2], lambda self, v: self._v.__setitem__(2, v))
+
+
+# ------------------------------------------------------------------------------
+# Collections
+# ------------------------------------------------------------------------------
+
+class PropCollection(list):
+    """List with bpy_prop_collection-style name lookup."""
+
+    def _find(self, key):
+        for item in self:
+            if getattr(item, "name", None) == key:
+                return item
+        return None
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            item = self._find(key)
+            if item is None:
+                raise KeyError(key)
+            return item
+        return super().__getitem__(key)
+
+    def __contains__(self, key):
+        if isinstance(key, str):
+            return self._find(key) is not None
+        return super().__contains__(key)
+
+    def get(self, key, default=None):
+        item = self._find(key)
+        return default if item is None else item
+
+    def keys(self):
+        return [item.name for item in self]
+
+    def foreach_get(self, attr, seq):
+        flat = []
+        for item in self:
+            value = getattr(item, attr)
+            flat.extend(value if hasattr(value, "__iter__") else [value])
+        seq[:len(flat)] = flat
+
+    def foreach_set(self, attr, seq):
+        if not self:
+            return
+        width = len(getattr(self[0], attr)) if hasattr(getattr(self[0], attr), "__len__") else 1
+        if len(seq) != width * len(self):
+            raise RuntimeError(f"internal error setting the array, expected {width * len(self)} items")
+        for i, item in enumerate(self):
+            if width == 1:
+                setattr(item, attr, seq[i])
+            else:
+                setattr(item, attr, Vector(seq[i * width:(i + 1) * width]))
+
+
+# ------------------------------------------------------------------------------
+# Node trees
+# ------------------------------------------------------------------------------
+
+SOCKET_KINDS = (
+    # (type, default factory); None means the socket has no default_value
+    ("GEOMETRY", None),
+    ("VALUE", lambda rng: round(rng.uniform(0, 10), 3)),
+    ("INT", lambda rng: rng.randint(0, 100)),
+    ("VECTOR", lambda rng: Vector((rng.random(), rng.random(), rng.random()))),
+    ("BOOLEAN", lambda rng: rng.random() > 0.5),
+    ("RGBA", lambda rng: Vector((rng.random(), rng.random(), rng.random(), 1.0))),
+)
+
+NODE_TYPES = (
+    "GeometryNodeSetPosition", "GeometryNodeTransform", "ShaderNodeMath",
+    "ShaderNodeVectorMath", "GeometryNodeInstanceOnPoints", "GeometryNodeJoinGeometry",
+    "FunctionNodeRandomValue", "GeometryNodeMeshGrid", "GeometryNodeRealizeInstances",
+)
+
+
+class NodeSocket:
+    def __init__(self, identifier, name, sock_type, default=None, node=None):
+        self.node = node
+        self.identifier = identifier
+        self.name = name
+        self.type = sock_type
+        self.is_linked = False
+        self.links = []
+        if default is not None:
+            self.default_value = default
+
+
+class Node:
+    def __init__(self, name, bl_idname, location=(0.0, 0.0)):
+        self.name = name
+        self.bl_idname = bl_idname
+        self.label = ""
+        self.location = Vector(location)
+        self.width = 140.0
+        self.mute = False
+        self.inputs = PropCollection()
+        self.outputs = PropCollection()
+
+
+class NodeLink:
+    def __init__(self, from_socket, to_socket, from_node, to_node):
+        self.from_socket = from_socket
+        self.to_socket = to_socket
+        self.from_node = from_node
+        self.to_node = to_node
+        self.is_valid = True
+
+
+class Nodes(PropCollection):
+    def __init__(self, tree):
+        super().__init__()
+        self._tree = tree
+
+    def new(self, type):
+        node = Node(self._unique(type.replace("GeometryNode", "").replace("ShaderNode", "")), type)
+        _add_sockets(node, random.Random(len(self)), 3, 2)
+        self.append(node)
+        return node
+
+    def remove(self, node):
+        for link in [l for l in self._tree.links if l.from_node is node or l.to_node is node]:
+            self._tree.links.remove(link)
+        list.remove(self, node)
+
+    def _unique(self, base):
+        names = set(self.keys())
+        if base not in names:
+            return base
+        i = 1
+        while f"{base}.{i:03d}" in names:
+            i += 1
+        return f"{base}.{i:03d}"
+
+
+class Links(PropCollection):
+    def new(self, from_socket, to_socket, from_node=None, to_node=None):
+        for existing in [l for l in self if l.to_socket is to_socket]:
+            self.remove(existing)
+        link = NodeLink(from_socket, to_socket, from_node or from_socket.node, to_node or to_socket.node)
+        from_socket.is_linked = to_socket.is_linked = True
+        self.append(link)
+        return link
+
+    def remove(self, link):
+        list.remove(self, link)
+        link.to_socket.is_linked = any(l.to_socket is link.to_socket for l in self)
+        link.from_socket.is_linked = any(l.from_socket is link.from_socket for l in self)
+
+
+class NodeTree:
+    bl_idname = "GeometryNodeTree"
+
+    def __init__(self, name):
+        self.name = name
+        self.nodes = Nodes(self)
+        self.links = Links()
+
+
+def _add_sockets(node, rng, n_inputs, n_outputs):
+    for i in range(n_inputs):
+        sock_type, factory = SOCKET_KINDS[0] if i == 0 else rng.choice(SOCKET_KINDS[1:])
+        node.inputs.append(NodeSocket(f"Input_{i}", f"{sock_type.title()} {i}", sock_type,
+                                      factory(rng) if factory else None, node))
+    for i in range(n_outputs):
+        sock_type = "GEOMETRY" if i == 0 else rng.choice(SOCKET_KINDS[1:])[0]
+        node.outputs.append(NodeSocket(f"Output_{i}", f"{sock_type.title()} {i}", sock_type, node=node))
+
+
+def make_node_tree(n_nodes, fan_out=2, inputs_per_node=4, outputs_per_node=2, seed=0, name=None):
+    """Builds a synthetic node tree with roughly `fan_out` incoming links per node.
+
+    Links always point from an earlier node to a later one, so the graph is a
+    DAG like a real Geometry Nodes tree.
+    """
+    rng = random.Random(seed)
+    tree = NodeTree(name or f"Synthetic_{n_nodes}")
+    nodes = []
+    for i in range(n_nodes):
+        node = Node(f"Node.{i:05d}", rng.choice(NODE_TYPES), (i % 50 * 200.0, i // 50 * -180.0))
+        _add_sockets(node, rng, inputs_per_node, outputs_per_node)
+        nodes.append(node)
+        list.append(tree.nodes, node)
+    for i, node in enumerate(nodes[1:], start=1):
+        for to_socket in list(node.inputs)[:fan_out]:
+            src = nodes[rng.randrange(max(0, i - 20), i)]
+            from_socket = rng.choice(src.outputs)
+            # Each input is linked once, so skip Links.new()'s replace scan.
+            from_socket.is_linked = to_socket.is_linked = True
+            list.append(tree.links, NodeLink(from_socket, to_socket, src, node))
+    return tree
+
+
+# ------------------------------------------------------------------------------
+# Scene
+# ------------------------------------------------------------------------------
+
+class Modifier:
+    def __init__(self, name, mod_type="NODES", node_group=None):
+        self.name = name
+        self.type = mod_type
+        self.node_group = node_group
+        self.is_active = False
+        self.show_viewport = True
+        self._inputs = {}
+
+    def __getitem__(self, key): return self._inputs[key]
+    def __setitem__(self, key, value): self._inputs[key] = value
+    def get(self, key, default=None): return self._inputs.get(key, default)
+
+
+class Object:
+    def __init__(self, name, obj_type="MESH"):
+        self.name = name
+        self.type = obj_type
+        self.location = Vector()
+        self.rotation_euler = Vector()
+        self.scale = Vector((1.0, 1.0, 1.0))
+        self.dimensions = Vector((2.0, 2.0, 2.0))
+        self.hide_viewport = False
+        self.hide_render = False
+        self.modifiers = PropCollection()
+        self.users_collection = []
+
+    def hide_get(self): return False
+    def update_tag(self, refresh=None): pass
+
+
+class Collection:
+    def __init__(self, name):
+        self.name = name
+        self.objects = PropCollection()
+        self.children = PropCollection()
+        self.all_objects = self.objects
+
+
+def build_scene(module, objects=10, nodes=50, fan_out=2, seed=0):
+    """Populates module.data with synthetic objects, each with a GN modifier."""
+    rng = random.Random(seed)
+    data = module.data
+    collection = Collection("Collection")
+    data.collections.append(collection)
+    for i in range(objects):
+        obj = Object(f"Object.{i:04d}")
+        obj.location = Vector((rng.uniform(-10, 10), rng.uniform(-10, 10), 0.0))
+        tree = make_node_tree(nodes, fan_out=fan_out, seed=seed + i, name=f"GN.{i:04d}")
+        data.node_groups.append(tree)
+        mod = Modifier("GeometryNodes", "NODES", tree)
+        mod.is_active = True
+        obj.modifiers.append(mod)
+        obj.users_collection = [collection]
+        collection.objects.append(obj)
+        data.objects.append(obj)
+    module.context.active_object = data.objects[0] if objects else None
+    module.context.view_layer.objects.active = module.context.active_object
+    return data
+
+
+# ------------------------------------------------------------------------------
+# Module assembly
+# ------------------------------------------------------------------------------
+
+class _Timers:
+    def __init__(self):
+        self._registered = set()
+
+    def register(self, func, first_interval=0, persistent=False):
+        self._registered.add(func)
+
+    def unregister(self, func):
+        self._registered.discard(func)
+
+    def is_registered(self, func):
+        return func in self._registered
+
+
+def _prop(*args, **kwargs):
+    return kwargs.get("default")
+
+
+class _Ops:
+    """Attribute chain that swallows operator calls (bpy.ops.x.y(...))."""
+
+    def __getattr__(self, name):
+        return _Ops()
+
+    def __call__(self, *args, **kwargs):
+        return {'FINISHED'}
+
+
+def install(objects=10, nodes=50, fan_out=2, seed=0, data_root=None):
+    """Creates the fake module, registers it as `bpy` and returns it."""
+    bpy = types.ModuleType("bpy")
+    data_root = data_root or tempfile.mkdtemp(prefix="fake_bpy_")
+
+    class _Base:
+        pass
+
+    bpy.types = types.SimpleNamespace(AddonPreferences=_Base, Operator=_Base, Panel=_Base, Object=Object)
+    bpy.props = types.SimpleNamespace(
+        StringProperty=_prop, EnumProperty=_prop, IntProperty=_prop, BoolProperty=_prop,
+        FloatProperty=_prop, FloatVectorProperty=_prop, CollectionProperty=_prop, PointerProperty=_prop)
+    bpy.utils = types.SimpleNamespace(
+        user_resource=lambda resource_type, path="", create=False: os.path.join(data_root, resource_type.lower(), path),
+        register_class=lambda cls: None,
+        unregister_class=lambda cls: None)
+    bpy.app = types.SimpleNamespace(
+        timers=_Timers(), background=True, version=(4, 5, 0), version_string="4.5.0 (fake)",
+        binary_path="", handlers=types.SimpleNamespace(
+            depsgraph_update_post=[], load_post=[], save_post=[], persistent=lambda func: func))
+    bpy.data = types.SimpleNamespace(
+        objects=PropCollection(), node_groups=PropCollection(), collections=PropCollection(),
+        filepath="", is_dirty=False)
+    bpy.context = types.SimpleNamespace(
+        active_object=None, selected_objects=[],
+        view_layer=types.SimpleNamespace(objects=types.SimpleNamespace(active=None)),
+        window_manager=types.SimpleNamespace(windows=[]),
+        preferences=types.SimpleNamespace(addons={}),
+        scene=types.SimpleNamespace(name="Scene", render=types.SimpleNamespace(filepath=""), frame_current=1),
+        screen=types.SimpleNamespace(areas=[]),
+        copy=lambda: {})
+    bpy.ops = _Ops()
+    build_scene(bpy, objects=objects, nodes=nodes, fan_out=fan_out, seed=seed)
+
+    sys.modules["bpy"] = bpy
+    return bpy
@@ -47,10 +47,16 @@ export interface CustomTool {
   code: string;
 }
 
+export interface ToolSaveResult {
+  success: boolean;
+  error?: string;
+}
+
 export interface ExecutionResult {
   success: boolean;
   stdout: string;
   stderr: string;
+  profile?: any;
 }
 
 export interface ScreenshotResult {
@@ -64,3 +70,49 @@ export interface GraphData {
   links: any[];
   error?: string;
 }
+
+export interface BulkSetResult {
+  count?: number;
+  objects?: string[];
+  written?: Record<string, number>;
+  vectorized?: string[];
+  failures?: Record<string, { error: string; count: number; objects: string[] }[]>;
+  missing?: string[];
+  error?: string;
+}
+
+export interface ContextResult {
+  context?: string;
+  chars?: number;
+  tokens_estimate?: number;
+  budget_chars?: number;
+  sections?: Record<string, { chars: number; lines: number; truncated: boolean; cached: boolean }>;
+  elapsed?: number;
+  error?: string;
+}
+
+export interface CheckpointResult {
+  name?: string;
+  elapsed?: number;
+  size_bytes?: number;
+  evicted?: string[];
+  filepath?: string;
+  previous_filepath?: string | null;
+  warning?: string;
+  unsaved_changes?: boolean;
+  error?: string;
+}
+
+export interface GraphChangeset {
+  tree?: string;
+  dry_run?: boolean;
+  added_nodes?: { name: string; type: string }[];
+  replaced_nodes?: { name: string; type: string }[];
+  removed_nodes?: string[];
+  updated?: any[];
+  added_links?: any[];
+  removed_links?: any[];
+  errors?: string[];
+  changes?: number;
+  error?: string;
+}
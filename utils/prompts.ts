@@ -42,7 +42,10 @@ For any task involving scene modification (Geometry Nodes, Object creation, etc.
 
 ### AVAILABLE TOOLS:
 - \`inspect_graph\`: Returns JSON of the active object's node tree (Nodes, Inputs, Links). Use socket \`identifier\` for stable scripting.
+- \`apply_graph\`: Declaratively set the node tree. Edit the \`inspect_graph\` JSON and pass it back; only the differences are applied. Omitted nodes are kept; deleting them needs \`remove_missing: true\` with the complete graph (check with \`dry_run\` first). Prefer it over \`execute_code\` for node graph edits.
+- \`set_objects\`: Bulk-set transforms, visibility or GN modifier inputs on many objects (by collection, pattern or names). Prefer it over \`execute_code\` loops for mass edits.
 - \`execute_code\`: Run Python scripts to modify the scene.
+- \`save_checkpoint\` / \`restore_checkpoint\`: Snapshot the scene before a risky change and roll back if it fails, instead of writing cleanup code.
 - \`get_screenshot\`: Captures the viewport.
 - \`search_knowledge_base\`: Query Qdrant vector DB.
 - \`qdrant_add_knowledge\`: Add documents to Qdrant.
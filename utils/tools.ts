@@ -26,7 +26,7 @@ export const createToolDef: FunctionDeclaration = {
       name: { type: Type.STRING, description: 'Readable name of the tool' },
       description: { type: Type.STRING, description: 'Short description of what the tool does' },
       trigger: { type: Type.STRING, description: 'The command trigger, usually starting with / (e.g., /cleanup)' },
-      code: { type: Type.STRING, description: 'The Python code to execute when triggered' }
+      code: { type: Type.STRING, description: 'The Python code to execute when triggered. Arguments passed to run_tool are available as the dict `args`.' }
     },
     required: ['name', 'description', 'trigger', 'code']
   }
@@ -39,7 +39,8 @@ export const runToolDef: FunctionDeclaration = {
   parameters: {
     type: Type.OBJECT,
     properties: {
-      trigger: { type: Type.STRING, description: 'The trigger command of the tool to run (e.g., /cleanup)' }
+      trigger: { type: Type.STRING, description: 'The trigger command of the tool to run (e.g., /cleanup)' },
+      args: { type: Type.STRING, description: 'Optional JSON object of arguments, available to the tool script as the dict `args`' }
     },
     required: ['trigger']
   }
@@ -55,6 +56,62 @@ export const inspectGraphTool: FunctionDeclaration = {
     }
 };
 
+// Tool: Apply Graph (Agentic)
+export const applyGraphTool: FunctionDeclaration = {
+    name: 'apply_graph',
+    description: 'Declaratively set the active Geometry Node graph. Pass the target graph in the same schema inspect_graph returns (nodes with name, type, label, location, inputs {identifier: {value}}, optional properties such as {"operation": "ADD"}; links with from_node, from_socket, to_node, to_socket). Only the differences are applied, in one step. Nodes and links you leave out are kept unless remove_missing is true. Prefer this over execute_code for building or editing node trees.',
+    parameters: {
+        type: Type.OBJECT,
+        properties: {
+            graph: { type: Type.STRING, description: 'JSON object with "nodes" and "links" describing the desired graph.' },
+            dry_run: { type: Type.BOOLEAN, description: 'Set to true to only report the changes that would be made.' },
+            remove_missing: { type: Type.BOOLEAN, description: 'Also delete every node and link not in the target (default false). Only set it when passing the complete graph, and run with dry_run first to check removed_nodes.' }
+        },
+        required: ['graph']
+    }
+};
+
+// Tool: Bulk Object Writes (Agentic)
+export const setObjectsTool: FunctionDeclaration = {
+    name: 'set_objects',
+    description: 'Set transforms, visibility or Geometry Nodes modifier inputs on many objects at once (fast, vectorized). Use this instead of execute_code loops for mass edits. Target objects by collection, name pattern (glob, e.g. "Tree.*") and/or a list of names.',
+    parameters: {
+        type: Type.OBJECT,
+        properties: {
+            collection: { type: Type.STRING, description: 'Collection name' },
+            pattern: { type: Type.STRING, description: 'Glob pattern on object names' },
+            names: { type: Type.ARRAY, items: { type: Type.STRING }, description: 'Explicit object names' },
+            properties: { type: Type.STRING, description: 'JSON object. Keys: location, rotation_euler, scale (3 values for all objects, or a flat array of 3 per object), hide_viewport, hide_render (one bool, or one per object).' },
+            modifier_inputs: { type: Type.STRING, description: 'JSON object of GN modifier input identifiers (e.g. "Socket_2") to a value written to every object as is (vectors too), {"per_object": [...]} with one value per object in target order, or {"by_name": {"ObjectName": value}} to set only the listed objects.' },
+            modifier: { type: Type.STRING, description: 'Modifier name (default: the first Geometry Nodes modifier)' },
+            dry_run: { type: Type.BOOLEAN, description: 'Only list the matched objects, in the order per-object arrays must follow.' }
+        }
+    }
+};
+
+// Tool: Scene Checkpoints (Agentic)
+export const saveCheckpointTool: FunctionDeclaration = {
+    name: 'save_checkpoint',
+    description: 'Save a named snapshot of the whole Blender scene before a risky change. Restore it with restore_checkpoint if the attempt fails, instead of writing cleanup code.',
+    parameters: {
+        type: Type.OBJECT,
+        properties: {
+            name: { type: Type.STRING, description: 'Checkpoint name (letters, digits, - _ .). Saving again with the same name overwrites it.' }
+        }
+    }
+};
+
+export const restoreCheckpointTool: FunctionDeclaration = {
+    name: 'restore_checkpoint',
+    description: 'Roll the Blender scene back to a checkpoint saved with save_checkpoint. If Blender has unsaved changes, the user is asked to confirm first. Afterwards the open file is the checkpoint copy: tell the user to use File > Save As to keep their work. Re-inspect the scene afterwards.',
+    parameters: {
+        type: Type.OBJECT,
+        properties: {
+            name: { type: Type.STRING, description: 'Checkpoint to restore (default: the most recent one)' }
+        }
+    }
+};
+
 // Tool: Screenshot (Agentic)
 export const screenshotTool: FunctionDeclaration = {
     name: 'get_screenshot',
@@ -76,6 +133,10 @@ export const executeCodeTool: FunctionDeclaration = {
                 type: Type.STRING,
                 description: 'The Python code to run. Ensure it uses `bpy` correctly.',
             },
+            profile: {
+                type: Type.BOOLEAN,
+                description: 'Set to true to run under cProfile and tracemalloc and get the slowest functions and top allocation sites back. Use it when a script is slow, e.g. to find per-vertex Python loops that should use foreach_set.',
+            },
         },
         required: ['code'],
     },
@@ -145,6 +206,10 @@ export const SYSTEM_TOOLS = [
   createToolDef, 
   runToolDef, 
   inspectGraphTool, 
+  applyGraphTool,
+  setObjectsTool,
+  saveCheckpointTool,
+  restoreCheckpointTool,
   screenshotTool, 
   executeCodeTool,
   searchKnowledgeBaseTool,